@@ -5,4 +5,5 @@
 # Proprietary and confidential for more information, please contact
 # lg@bizzup.app
 
-from . import models
\ No newline at end of file
+from . import models
+from . import wizards
@@ -11,14 +11,18 @@
         Ticket : HT01634
         This module help to import product and lot from csv file
      """,
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.0.34",
     "category": "",
     "license": "Other proprietary",
     "author": "Gilliam Management Services and Information Systems, Ltd.",
     "website": "www.bizzup.app",
-    "depends": ["contacts", "sale_management", "purchase","stock"],
-    "data": ["data/ir_cron_data.xml",
-             "views/product_product_view.xml"],
+    "depends": ["contacts", "sale_management", "purchase","stock",
+                "bizzup_serial_registry"],
+    "data": ["security/ir.model.access.csv",
+             "data/ir_cron_data.xml",
+             "views/product_product_view.xml",
+             "views/product_import_run_views.xml",
+             "wizards/product_import_wizard.xml"],
     "installable": True,
     "application": False,
 }
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+"""Benchmarks of the product import, run against a scratch database.
+
+The harness is not loaded with the module; see :mod:`.run_benchmarks`.
+"""
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+"""Measure how the product import entry points scale with the size of the sheet.
+
+For every sheet size, fresh synthetic sheets (see :mod:`.sheet_generator`)
+are imported with :meth:`~product.template.import_csv_data`,
+:meth:`~product.template.import_products_csv_data` (committing every
+row, then bulk),
+:meth:`~stock.lot.create_lot_from_csv` (bulk) and the single pass
+:meth:`~product.template.import_product_sheet`, reporting wall time,
+rows/s, queries per row and peak Python memory of each. The rows/s of
+the two product imports are also reported side by side.
+
+The imports commit, so only run this against a scratch database, e.g.::
+
+    $ odoo-bin shell -d scratch_db
+    >>> from odoo.addons.bizzup_import_product.benchmarks import run_benchmarks
+    >>> run_benchmarks.run(env, sizes=(1000, 10000))
+
+Peak memory is traced with :mod:`tracemalloc`, which slows Python code
+down; pass ``trace_memory=False`` for wall times comparable with
+production runs.
+"""
+
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ..utils.csv_stream import iter_csv_rows
+from ..utils.sheet_schema import SheetSchema
+from .sheet_generator import generate_sheet
+
+_logger = logging.getLogger(__name__)
+
+SIZES = (1000, 10000, 100000)
+# Product imports compared side by side in the report
+PER_ROW_LABEL = 'products (per row commit)'
+BULK_LABEL = 'products (bulk)'
+
+
+def _last_run_id(env):
+    env.cr.execute("SELECT COALESCE(MAX(id), 0) FROM product_import_run")
+    return env.cr.fetchone()[0]
+
+
+def _run_phases(env, after_run_id):
+    """Lookup, create and commit time of the import runs written since ``after_run_id``."""
+    runs = env['product.import.run'].search([('id', '>', after_run_id)])
+    if not runs:
+        return {}
+    return {
+        'lookup': sum(runs.mapped('lookup_time')),
+        'create': sum(runs.mapped('create_time')),
+        'commit': sum(runs.mapped('commit_time')),
+    }
+
+
+def measure(env, label, rows, function, *args, trace_memory=True, **kwargs):
+    """Run an entry point once and return its measurements as a dict.
+
+    Phases are the stage timings the entry point returns, or else the
+    lookup, create and commit time of the ``product.import.run`` it wrote.
+    """
+    last_run_id = _last_run_id(env)
+    queries = env.cr.sql_log_count
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.time()
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        wall_time = time.time() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+        if trace_memory:
+            tracemalloc.stop()
+    queries = env.cr.sql_log_count - queries
+    phases = (result or {}).get('timings') or _run_phases(env, last_run_id)
+    return {
+        'label': label,
+        'rows': rows,
+        'wall_time': wall_time,
+        'rows_per_second': rows / (wall_time or 1),
+        'queries': queries,
+        'queries_per_row': queries / (rows or 1),
+        'peak_memory': peak_memory,
+        'phases': phases,
+    }
+
+
+def _read_rows(file_path):
+    """Baseline phase: stream and decode the sheet without touching the database."""
+    schema = None
+    for row in iter_csv_rows(file_path):
+        schema = schema or SheetSchema(row)
+        schema.decode(row)
+
+
+def run_size(env, size, directory, seed=0, trace_memory=True):
+    """Benchmark every entry point on fresh sheets of ``size`` rows."""
+    ProductTemplate = env['product.template']
+    # Serial numbers never imported before, so no row is skipped as unchanged
+    first_serial = int(time.time() * 1000)
+    staged_sheet = generate_sheet(
+        os.path.join(directory, f'sheet_{size}.csv'), size, seed,
+        first_serial)
+    single_pass_sheet = generate_sheet(
+        os.path.join(directory, f'sheet_{size}_single_pass.csv'), size, seed,
+        first_serial + size)
+    # Same seed, so the templates imported from the staged sheet match its
+    # titles, but serials of its own
+    per_row_sheet = generate_sheet(
+        os.path.join(directory, f'sheet_{size}_per_row.csv'), size, seed,
+        first_serial + 2 * size)
+
+    return [
+        measure(env, 'read', size, _read_rows, staged_sheet,
+                trace_memory=trace_memory),
+        measure(env, 'templates', size, ProductTemplate.import_csv_data,
+                iter_csv_rows(staged_sheet), trace_memory=trace_memory),
+        measure(env, PER_ROW_LABEL, size,
+                ProductTemplate.import_products_csv_data,
+                iter_csv_rows(per_row_sheet), commit_per_row=True,
+                trace_memory=trace_memory),
+        measure(env, BULK_LABEL, size,
+                ProductTemplate.import_products_csv_data,
+                iter_csv_rows(staged_sheet), bulk=True,
+                trace_memory=trace_memory),
+        measure(env, 'lots (bulk)', size,
+                env['stock.lot'].create_lot_from_csv, staged_sheet, bulk=True,
+                trace_memory=trace_memory),
+        measure(env, 'single pass', size, ProductTemplate.import_product_sheet,
+                iter_csv_rows(single_pass_sheet), trace_memory=trace_memory),
+    ]
+
+
+def report(results):
+    """Log the measurements as one line per sheet size and entry point.
+
+    Then one line per sheet size compares the rows/s of the product import
+    committing every row with the bulk one.
+    """
+    by_size = {}
+    for result in results:
+        by_size.setdefault(result['rows'], {})[result['label']] = result
+        phases = ', '.join(f"{phase}={elapsed:.2f}s"
+                           for phase, elapsed in result['phases'].items())
+        _logger.info(
+            f"[{result['rows']} rows] {result['label']}: {result['wall_time']:.2f}s, {result['rows_per_second']:.1f} rows/s, {result['queries_per_row']:.2f} queries/row ({result['queries']}), peak memory {result['peak_memory'] / 1024 / 1024:.1f} MiB{f', phases: {phases}' if phases else ''}")
+    for rows, size_results in by_size.items():
+        per_row, bulk = size_results.get(PER_ROW_LABEL), size_results.get(BULK_LABEL)
+        if per_row and bulk:
+            _logger.info(
+                f"[{rows} rows] products: {per_row['rows_per_second']:.1f} rows/s committing every row, {bulk['rows_per_second']:.1f} rows/s bulk ({bulk['rows_per_second'] / (per_row['rows_per_second'] or 1):.1f}x)")
+
+
+def run(env, sizes=SIZES, directory=None, seed=0, trace_memory=True):
+    """Benchmark the import entry points for every sheet size and log a report.
+
+    :param sizes: data rows of the generated sheets
+    :param directory: where the sheets are written, a temporary directory
+                      by default
+    :return: list of measurement dicts, see :func:`measure`
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for size in sizes:
+            results += run_size(env, size, directory or temporary_directory,
+                                seed, trace_memory)
+    report(results)
+    return results
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+"""Generate synthetic product sheets in the layout of ``Product Data - Sheet.csv``.
+
+Values follow the distributions of the real sheet: ``#N/A`` and ``#REF!``
+cells, mostly empty placeholder rows, prices in shekels and dates written
+as ``dd/mm/yyyy``, ``yyyy-mm-dd`` or Excel serial numbers. The module has
+no Odoo dependency so sheets can be generated from the command line::
+
+    python3 sheet_generator.py /tmp/sheet_10k.csv 10000
+"""
+
+import csv
+import random
+import sys
+from datetime import date, timedelta
+
+HEADERS = ['S/N', 'Supplier name', 'Top', 'Base Color', 'HL', 'Length (inch)',
+           'Layer', 'Style', 'Size', 'EU', 'Status', 'Date Ordered',
+           'תאריך הגעה', 'Sold date', 'sales order customer name',
+           'Sale price', 'Product Title', 'Product Category']
+
+# (value, weight) pairs taken from the real sheet
+SUPPLIERS = [('OT', 46), ('OJ', 12), ('EB', 11), ('BL', 10), ('RF', 7),
+             ('ME', 3), ('TE', 3), ('YL', 1), ('YF', 1), ('DS', 1), ('', 1)]
+TOPS = [('Lace', 'Full Lace Top Wig', 50), ('Fall', 'Regular Fall', 21),
+        ('Silk', 'Regular/Silk Wig', 17), ('Sportswig', 'Sportswig Fall', 2),
+        ('Scrunchie', 'Scrunchie', 1), ('PonyClip', 'PonyClip', 1),
+        ('iBand', 'iBand', 1)]
+BASE_COLORS = [('4', 25), ('4/6', 17), ('2/4', 12), ('6', 11), ('2', 5),
+               ('d6', 4), ('DW', 3), ('M147', 2), ('14/16', 1)]
+HIGHLIGHTS = [('', 33), ('12', 16), ('10', 15), ('8', 12), ('b10', 5),
+              ('8/10', 4), ('8D', 2), ('12 ashy 60%', 2)]
+LENGTHS = [('16', 21), ('18', 20), ('14', 17), ('20', 15), ('12', 10),
+           ('22', 6), ('24', 3), ('15', 2)]
+LAYERS = [('None', 84), ('Slight', 12), ('Layered', 2), ('', 1), ('Small', 1)]
+STYLES = [('BW', 61), ('ST', 37), ('CR', 1), ('', 1)]
+SIZES = [('M', 54), ('S', 23), ('L', 19), ('', 2), ('XS', 2), ('XL', 1)]
+ORIGINS = [('EU', 57), ('CH', 24), ('BR', 17), ('RU', 1), ('#N/A', 1)]
+STATUSES = [('Sold', 73), ('#REF!', 13), ('Wish List', 7), ('Returned', 4),
+            ('Other', 1), ('Missing', 1), ('Order Reserved', 1)]
+CUSTOMERS = ['Bracha Blum', 'Leah Rosenstein', 'Kiara', 'Alina',
+             'רייכמן חסידה', 'שרה לוי', 'Batel from bet shemesh', '']
+
+# Share of placeholder rows that only carry an S/N and a status
+PLACEHOLDER_RATIO = 0.02
+FIRST_DATE = date(2020, 12, 15)
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def _pick(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _format_date(rng, value):
+    """Write a date the way the sheet does: mostly dd/mm/yyyy, sometimes not."""
+    roll = rng.random()
+    if roll < 0.85:
+        return value.strftime('%d/%m/%Y')
+    if roll < 0.93:
+        return value.strftime('%Y-%m-%d')
+    return str((value - EXCEL_EPOCH).days)
+
+
+def generate_rows(count, seed=0, first_serial=10001):
+    """Yield ``count`` synthetic sheet rows as dicts keyed by :data:`HEADERS`."""
+    rng = random.Random(seed)
+    for serial in range(first_serial, first_serial + count):
+        if rng.random() < PLACEHOLDER_RATIO:
+            row = dict.fromkeys(HEADERS, '')
+            row.update({'S/N': str(serial), 'EU': '#N/A', 'Status': 'Returned',
+                        'Product Title': f"(#{serial})"})
+            yield row
+            continue
+
+        top, category = rng.choices(
+            [(top, category) for top, category, _weight in TOPS],
+            [weight for _top, _category, weight in TOPS])[0]
+        ordered = FIRST_DATE + timedelta(days=rng.randrange(1600))
+        arrived = ordered + timedelta(days=rng.randrange(5, 60))
+        status = _pick(rng, STATUSES)
+        sold = arrived + timedelta(days=rng.randrange(1, 400))
+        has_sale = status == 'Sold'
+        yield {
+            'S/N': str(serial),
+            'Supplier name': _pick(rng, SUPPLIERS),
+            'Top': top,
+            'Base Color': _pick(rng, BASE_COLORS),
+            'HL': _pick(rng, HIGHLIGHTS),
+            'Length (inch)': _pick(rng, LENGTHS),
+            'Layer': _pick(rng, LAYERS),
+            'Style': _pick(rng, STYLES),
+            'Size': _pick(rng, SIZES),
+            'EU': _pick(rng, ORIGINS),
+            'Status': status,
+            'Date Ordered': _format_date(rng, ordered) if rng.random() < 0.85 else '',
+            'תאריך הגעה': _format_date(rng, arrived),
+            'Sold date': _format_date(rng, sold) if has_sale else '',
+            'sales order customer name': rng.choice(CUSTOMERS) if has_sale else '',
+            'Sale price': f"₪{rng.randrange(1200, 6000):,}.00" if has_sale else '',
+            'Product Title': f"{category} (#{serial})",
+            'Product Category': category,
+        }
+
+
+def generate_sheet(file_path, count, seed=0, first_serial=10001):
+    """Write a synthetic sheet of ``count`` data rows to ``file_path``."""
+    with open(file_path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=HEADERS)
+        writer.writeheader()
+        writer.writerows(generate_rows(count, seed, first_serial))
+    return file_path
+
+
+if __name__ == '__main__':
+    generate_sheet(sys.argv[1], int(sys.argv[2]))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Drop the serial registry rows the import added for products.
+
+    Products are now found by their internal reference and the registry
+    only keeps the lots of serials and the serials assigned on receipts.
+    """
+    if not version:
+        return
+    cr.execute("""
+        DELETE FROM stock_serial_registry registry
+         USING product_product product
+         WHERE registry.lot_id IS NULL
+           AND product.id = registry.product_id
+           AND product.default_code = registry.name
+    """)
+    if cr.rowcount:
+        _logger.info(
+            f"Removed {cr.rowcount} product entries from the serial registry")
@@ -7,4 +7,14 @@
 
 from . import product_template
 from . import product_product
-from . import stock_lot
\ No newline at end of file
+from . import stock_lot
+from . import product_import_fingerprint
+from . import product_import_checkpoint
+from . import product_import_run
+from . import product_import_chunk
+from . import product_import_validation
+from . import product_import_cache
+from . import product_import_name
+from . import product_category
+from . import product_attribute
+from . import res_partner
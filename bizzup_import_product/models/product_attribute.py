@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+from odoo import models
+
+
+class ProductAttribute(models.Model):
+    _inherit = 'product.attribute'
+
+    def write(self, vals):
+        """Invalidate the import lookup cache when an attribute is renamed or archived."""
+        if {'name', 'active'} & vals.keys():
+            self.env['product.import.cache'].invalidate_lookup_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidate the import lookup cache when an attribute is deleted."""
+        self.env['product.import.cache'].invalidate_lookup_cache()
+        return super().unlink()
+
+
+class ProductAttributeValue(models.Model):
+    _inherit = 'product.attribute.value'
+
+    def write(self, vals):
+        """Invalidate the import lookup cache when a value is renamed or moved."""
+        if {'name', 'attribute_id', 'active'} & vals.keys():
+            self.env['product.import.cache'].invalidate_lookup_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidate the import lookup cache when a value is deleted."""
+        self.env['product.import.cache'].invalidate_lookup_cache()
+        return super().unlink()
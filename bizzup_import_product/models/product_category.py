@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+from odoo import models
+
+
+class ProductCategory(models.Model):
+    _inherit = 'product.category'
+
+    def write(self, vals):
+        """Invalidate the import lookup cache when a category is renamed."""
+        if 'name' in vals:
+            self.env['product.import.cache'].invalidate_lookup_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidate the import lookup cache when a category is deleted."""
+        self.env['product.import.cache'].invalidate_lookup_cache()
+        return super().unlink()
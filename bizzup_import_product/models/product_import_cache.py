@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+import threading
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+# Lookup tables kept by this worker between import runs, per (database,
+# language, thread): cron threads never see the uncommitted ids of another one
+_LOOKUP_CACHES = {}
+
+
+class ImportLookupCache:
+    """Name to id lookup tables used by the product importers.
+
+    The dicts have the shape the ``get_or_create_*`` methods of
+    ``product.template`` expect, so they can be passed as their caches.
+    """
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.categories = {}
+        self.attributes = {}
+        self.values = {}
+        self.suppliers = {}
+
+    def clear(self):
+        """Empty every table in place, so references held by a running import see it."""
+        for table in (self.categories, self.attributes, self.values,
+                      self.suppliers):
+            table.clear()
+
+
+class ProductImportCache(models.AbstractModel):
+    """Preloaded, worker-wide lookup caches for the product importers.
+
+    The tables are filled with one read per model at the start of a run and
+    reused by later runs of the same worker. Writing or deleting a cached
+    model bumps a database sequence once the transaction is committed, which
+    tells every worker to reload its tables at the start of its next run.
+    Entries only ever map to existing records: a name missing from a table
+    is still searched for before anything is created.
+
+    Tables are private to the thread that loaded them, and dropped whenever
+    the import rolls back a transaction (see :meth:`rollback`), since they
+    may hold the ids of records that were never committed.
+    """
+    _name = 'product.import.cache'
+    _description = 'Product Import Lookup Cache'
+
+    def init(self):
+        self.env.cr.execute(
+            "CREATE SEQUENCE IF NOT EXISTS product_import_cache_seq")
+
+    def _get_generation(self):
+        self.env.cr.execute("SELECT last_value FROM product_import_cache_seq")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def get_lookup_cache(self):
+        """Return the lookup cache of this database, (re)loading it when it is stale."""
+        key = (self.env.cr.dbname, self.env.lang, threading.get_ident())
+        generation = self._get_generation()
+        cache = _LOOKUP_CACHES.get(key)
+        if cache is None or cache.generation != generation:
+            cache = ImportLookupCache(generation)
+            self._load_lookup_cache(cache)
+            _LOOKUP_CACHES[key] = cache
+        return cache
+
+    def _load_lookup_cache(self, cache):
+        """Fill the tables with one read per model.
+
+        Records are read in the default order of their model, the first one
+        wins on duplicate names, like the ``search(limit=1)`` it replaces.
+        """
+        for category in self.env['product.category'].search_read(
+                [], ['name']):
+            cache.categories.setdefault(category['name'], category['id'])
+        for attribute in self.env['product.attribute'].search_read(
+                [], ['name']):
+            cache.attributes.setdefault(attribute['name'], attribute['id'])
+        for value in self.env['product.attribute.value'].search_read(
+                [], ['attribute_id', 'name']):
+            cache.values.setdefault(
+                (value['attribute_id'][0], value['name']), value['id'])
+        for supplier in self.env['res.partner'].search_read(
+                [('supplier_rank', '>', 0)], ['name']):
+            if supplier['name']:
+                cache.suppliers.setdefault(supplier['name'], supplier['id'])
+        _logger.info(
+            f"Loaded import lookup cache: {len(cache.categories)} categories, {len(cache.attributes)} attributes, {len(cache.values)} values, {len(cache.suppliers)} suppliers")
+
+    @api.model
+    def discard_lookup_cache(self):
+        """Drop the tables of this thread, e.g. after a rollback removed records they point to."""
+        thread_id = threading.get_ident()
+        for key in [key for key in _LOOKUP_CACHES
+                    if key[0] == self.env.cr.dbname and key[2] == thread_id]:
+            _LOOKUP_CACHES.pop(key).clear()
+
+    @api.model
+    def rollback(self):
+        """Roll back the current transaction and drop the tables that may point to its records."""
+        self.env.cr.rollback()
+        self.discard_lookup_cache()
+
+    @api.model
+    def invalidate_lookup_cache(self):
+        """Invalidate the tables of every worker once the current transaction commits."""
+        self.discard_lookup_cache()
+        postcommit = self.env.cr.postcommit
+        if not postcommit.data.get('product_import_cache_bump'):
+            postcommit.data['product_import_cache_bump'] = True
+            postcommit.add(self._bump_generation)
+
+    def _bump_generation(self):
+        with self.env.registry.cursor() as cr:
+            cr.execute("SELECT nextval('product_import_cache_seq')")
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+import os
+import time
+
+from odoo import models, fields, api
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+# Share of the cron time budget an import may use before pausing itself
+TIME_BUDGET_RATIO = 0.8
+
+
+class ProductImportCheckpoint(models.Model):
+    """Progress of an import job, saved in the same transaction as each chunk.
+
+    A job that stops before the end of its file (time budget exhausted,
+    worker restart) resumes from the saved row offset on its next run, as
+    long as the file did not change in between.
+    """
+    _name = 'product.import.checkpoint'
+    _description = 'Product Import Checkpoint'
+
+    job = fields.Char(string='Job', required=True)
+    file_identity = fields.Char(string='File Identity', required=True)
+    row_offset = fields.Integer(string='Rows Done')
+    stats = fields.Json(string='Statistics')
+    run_id = fields.Many2one('product.import.run', string='Import Run',
+                             ondelete='set null')
+
+    _sql_constraints = [
+        ('job_uniq', 'unique(job)', 'An import job can only have one checkpoint.'),
+    ]
+
+    @api.model
+    def get_file_identity(self, file_path):
+        """Identify a version of a file by its path, size and modification time."""
+        stat = os.stat(file_path)
+        return f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @api.model
+    def get_deadline(self):
+        """Return the time at which a cron import should pause itself, or None.
+
+        The budget is the ``bizzup_import_product.time_budget`` system
+        parameter (seconds), else a share of the cron real time limit of the
+        server.
+        """
+        budget = int(self.env['ir.config_parameter'].sudo().get_param(
+            'bizzup_import_product.time_budget', 0))
+        if not budget:
+            limit = config.get('limit_time_real_cron', -1)
+            if limit is None or limit < 0:
+                limit = config.get('limit_time_real', 0)
+            budget = (limit or 0) * TIME_BUDGET_RATIO
+        return time.time() + budget if budget > 0 else None
+
+    @api.model
+    def resume(self, job, file_identity):
+        """Return the checkpoint of a job, restarting it if the file changed."""
+        checkpoint = self.search([('job', '=', job)], limit=1)
+        if checkpoint and checkpoint.file_identity != file_identity:
+            _logger.info(
+                f"Import job {job}: file changed since the last checkpoint, starting from the first row")
+            checkpoint.unlink()
+            checkpoint = self.browse()
+        if not checkpoint:
+            checkpoint = self.create({
+                'job': job,
+                'file_identity': file_identity,
+                'row_offset': 0,
+                'stats': {},
+            })
+        elif checkpoint.row_offset:
+            _logger.info(
+                f"Import job {job}: resuming after row {checkpoint.row_offset}")
+        return checkpoint
+
+    def save(self, row_offset, stats):
+        """Record the rows done so far; committed together with the chunk."""
+        self.ensure_one()
+        self.write({'row_offset': row_offset, 'stats': stats})
+
+    def done(self):
+        """Drop the checkpoint once the whole file has been imported."""
+        self.unlink()
+
+    @api.model
+    def run_job(self, job, file_path, cron_xmlid, import_function, *args,
+                **kwargs):
+        """Run an import function from its checkpoint under the cron time budget.
+
+        ``import_function`` is called with ``checkpoint`` and ``deadline``
+        keyword arguments and returns a dict with a ``done`` key; when it
+        paused before the end of the file, the cron is triggered again so the
+        next run continues from the checkpoint.
+        """
+        checkpoint = self.resume(job, self.get_file_identity(file_path))
+        try:
+            result = import_function(*args, checkpoint=checkpoint,
+                                     deadline=self.get_deadline(), **kwargs)
+        except Exception:
+            # Keep the chunks committed so far and flag their run as failed
+            self.env['product.import.cache'].rollback()
+            if checkpoint.exists() and checkpoint.run_id:
+                checkpoint.run_id.finish('failed')
+                self.env.cr.commit()
+            raise
+        if result and not result.get('done'):
+            cron = self.env.ref(cron_xmlid, raise_if_not_found=False)
+            if cron:
+                cron._trigger()
+        return result
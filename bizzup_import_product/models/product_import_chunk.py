@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+import os
+import time
+import zlib
+from collections import defaultdict
+
+from psycopg2 import errors
+
+from odoo import models, fields, api
+
+from ..utils.csv_stream import SKIP_ROWS, iter_sheet_rows, peek_row, skip_rows
+from ..utils.import_ledger import ImportLedger
+from ..utils.ptav_index import PtavIndex
+from ..utils.sheet_schema import PRODUCT_HEADERS, SheetSchema, name_match_key
+from ..utils.xlsx_stream import jsonable_row
+from .product_import_run import RUN_COUNTERS
+
+_logger = logging.getLogger(__name__)
+
+# Template partitions of a chunked run, see get_bucket_count
+DEFAULT_BUCKETS = 32
+# Failed attempts after which a chunk is left failed instead of pending
+MAX_ATTEMPTS = 3
+# Claims retried when a concurrent worker commit makes the snapshot stale
+CLAIM_ATTEMPTS = 5
+# Cron jobs claiming chunks, one Odoo cron worker each
+WORKER_CRONS = tuple(
+    f'bizzup_import_product.cron_import_chunk_worker_{worker}'
+    for worker in range(1, 5))
+SHEET_STAGES = ('template', 'product', 'lot')
+
+
+class ProductImportChunk(models.Model):
+    """Slice of a chunked product sheet import that any cron worker can process.
+
+    The planner partitions the rows of the sheet by product template into
+    buckets and stores each bucket as a sequence of chunks. Workers claim the
+    first pending chunk of a bucket with ``FOR UPDATE SKIP LOCKED`` and
+    process it in one transaction, so the chunks of a bucket run one after
+    the other and two workers never write the attribute lines of the same
+    template, while different buckets run in parallel on every worker.
+    """
+    _name = 'product.import.chunk'
+    _description = 'Product Import Chunk'
+    _order = 'run_id, bucket, sequence'
+
+    run_id = fields.Many2one('product.import.run', string='Run',
+                             required=True, ondelete='cascade', index=True)
+    bucket = fields.Integer(string='Bucket', required=True)
+    sequence = fields.Integer(string='Sequence', required=True)
+    state = fields.Selection(
+        [('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')],
+        string='Status', required=True, default='pending')
+    full = fields.Boolean(string='Full Import')
+    row_count = fields.Integer(string='Rows')
+    row_numbers = fields.Json(string='Row Numbers')
+    rows = fields.Json(string='Rows Data')
+    stats = fields.Json(string='Statistics')
+    timings = fields.Json(string='Timings')
+    attempts = fields.Integer(string='Attempts')
+    error = fields.Text(string='Error')
+    date_done = fields.Datetime(string='Processed')
+
+    def init(self):
+        # Claiming looks for the first pending chunk of every bucket
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS product_import_chunk_pending_idx
+                ON product_import_chunk (run_id, bucket, sequence)
+             WHERE state = 'pending'
+        """)
+
+    @api.model
+    def get_bucket_count(self):
+        """Template partitions of a chunked run.
+
+        Set with the ``bizzup_import_product.chunk_buckets`` system
+        parameter; more buckets than workers keeps every worker busy.
+        """
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'bizzup_import_product.chunk_buckets',
+            DEFAULT_BUCKETS)) or DEFAULT_BUCKETS
+
+    @api.model
+    def _get_plan_bucket_count(self):
+        """Bucket count of a new run: the one of the runs still pending, if any.
+
+        Runs with pending chunks are serialized per bucket, so a template
+        must land in the same bucket in every run until they are done,
+        whatever the parameter says meanwhile.
+        """
+        self.env.cr.execute("""
+            SELECT run.bucket_count
+              FROM product_import_run run
+             WHERE run.bucket_count > 0
+               AND EXISTS (SELECT 1 FROM product_import_chunk chunk
+                            WHERE chunk.run_id = run.id
+                              AND chunk.state = 'pending')
+             ORDER BY run.id
+             LIMIT 1
+        """)
+        row = self.env.cr.fetchone()
+        return row[0] if row else self.get_bucket_count()
+
+    @api.model
+    def plan(self, csv_data, full=False, chunk_size=None, buckets=None,
+             run=None):
+        """Split a sheet into the chunks of a new run and release them to the workers.
+
+        Rows are assigned to a bucket by the match key of their product
+        template, with the bucket count of the runs still pending so a
+        template keeps its bucket across runs. Categories, attributes,
+        attribute values and suppliers of the whole sheet are created here,
+        before any chunk exists, so the workers mostly look them up; the
+        claims of ``product.import.name`` keep concurrent imports from
+        creating them twice.
+
+        :param csv_data: iterable of CSV rows as dicts, consumed lazily
+        :param full: reprocess every row, ignoring the stored fingerprints
+        :param chunk_size: rows per chunk, see ``get_import_batch_size``
+        :param buckets: template partitions, see :meth:`get_bucket_count`
+        :param run: queued ``product.import.run`` to plan, a new run is
+                    created when not given
+        :return: the ``product.import.run`` of the chunks, or None if the
+                 sheet is invalid
+        """
+        Template = self.env['product.template']
+        first_row, csv_data = peek_row(csv_data)
+        schema = SheetSchema(first_row or ())
+        if not first_row or schema.missing_headers(PRODUCT_HEADERS):
+            _logger.error(
+                f"Invalid CSV headers. Expected: {set(PRODUCT_HEADERS)}, Found: {first_row.keys() if first_row else 'Empty'}")
+            if run:
+                run.finish('failed')
+                self.env.cr.commit()
+            return None
+
+        chunk_size = chunk_size or Template.get_import_batch_size()
+        buckets = buckets or self._get_plan_bucket_count()
+        lookup_cache = self.env['product.import.cache'].get_lookup_cache()
+        if run:
+            run.write({'state': 'running', 'date_start': fields.Datetime.now(),
+                       'full': full, 'bucket_count': buckets})
+        else:
+            run = self.env['product.import.run'].create(
+                {'name': 'product_sheet_chunks', 'full': full,
+                 'bucket_count': buckets})
+        pending = defaultdict(list)
+        sequences = defaultdict(int)
+        total_rows = 0
+
+        def add_chunk(bucket):
+            numbered_rows = pending.pop(bucket)
+            sequences[bucket] += 1
+            self.create({
+                'run_id': run.id,
+                'bucket': bucket,
+                'sequence': sequences[bucket],
+                'full': full,
+                'row_count': len(numbered_rows),
+                'row_numbers': [row_number for row_number, _row in numbered_rows],
+                'rows': [jsonable_row(row) for _row_number, row in numbered_rows],
+            })
+
+        for row_number, row in enumerate(skip_rows(csv_data, SKIP_ROWS),
+                                         start=1):
+            data = schema.decode(row)
+            schema.observe_dates(row)
+            self._create_shared_records(data, lookup_cache)
+            key = name_match_key(data['product_title'] or '')
+            bucket = zlib.crc32(key.encode()) % buckets
+            pending[bucket].append((row_number, row))
+            total_rows += 1
+            if len(pending[bucket]) >= chunk_size:
+                add_chunk(bucket)
+        for bucket in list(pending):
+            add_chunk(bucket)
+        run.rows_total = total_rows
+        # Date formats of the whole file, the same for every chunk
+        run.date_formats = schema.detected_date_formats()
+
+        if not total_rows:
+            _logger.warning("No data to process after skipping first 5 rows")
+            run.finish('done')
+            self.env.cr.commit()
+            return run
+        self.env.cr.commit()
+        _logger.info(
+            f"Import run {run.id}: planned {total_rows} rows in {sum(sequences.values())} chunks over {len(sequences)} buckets")
+        self._trigger_workers()
+        return run
+
+    def _create_shared_records(self, data, lookup_cache):
+        """Get or create the category, attributes and supplier of a decoded row."""
+        Template = self.env['product.template']
+        Template.get_or_create_category(data['category_name'],
+                                        lookup_cache.categories)
+        for attr_name, attr_value in data['attributes'].items():
+            Template.get_or_create_attribute(attr_name, attr_value,
+                                             lookup_cache.attributes,
+                                             lookup_cache.values)
+        Template.get_or_create_supplier(data['supplier_name'],
+                                        lookup_cache.suppliers)
+
+    @api.model
+    def _trigger_workers(self):
+        for xmlid in WORKER_CRONS:
+            cron = self.env.ref(xmlid, raise_if_not_found=False)
+            if cron and cron.active:
+                cron._trigger()
+
+    @api.model
+    def claim(self):
+        """Lock and return the next chunk this worker may process.
+
+        Only the first pending chunk of every bucket is a candidate, oldest
+        run first, so runs of several files never process the same template
+        at once; the chunks locked by other workers are skipped. Call it at the start of a
+        transaction, so its snapshot sees the chunks committed meanwhile: the
+        transaction is rolled back and the claim retried when that snapshot
+        turns out stale.
+
+        :return: the claimed chunk, or an empty recordset
+        """
+        for _attempt in range(CLAIM_ATTEMPTS):
+            try:
+                with self.env.cr.savepoint(flush=False):
+                    self.env.cr.execute("""
+                        SELECT chunk.id
+                          FROM product_import_chunk chunk
+                         WHERE chunk.id IN (
+                                SELECT DISTINCT ON (head.bucket) head.id
+                                  FROM product_import_chunk head
+                                 WHERE head.state = 'pending'
+                                 ORDER BY head.bucket, head.run_id, head.sequence)
+                         ORDER BY chunk.run_id, chunk.sequence, chunk.bucket
+                         LIMIT 1
+                           FOR UPDATE SKIP LOCKED
+                    """)
+                    row = self.env.cr.fetchone()
+            except errors.SerializationFailure:
+                # Another worker finished the head of a bucket after our
+                # snapshot, retry in a new transaction to see its commit
+                self.env['product.import.cache'].rollback()
+                continue
+            return self.browse(row[0] if row else ())
+        # Chunks are still pending, leave them to the next worker run
+        _logger.info(
+            f"Could not claim a chunk after {CLAIM_ATTEMPTS} attempts, triggering the workers again")
+        self._trigger_workers()
+        self.env.cr.commit()
+        return self.browse()
+
+    def process(self, lookup_cache=None):
+        """Import the rows of a claimed chunk and mark it done; committing is left to the caller."""
+        self.ensure_one()
+        start_time = time.time()
+        if lookup_cache is None:
+            lookup_cache = self.env['product.import.cache'].get_lookup_cache()
+        stats = {stage: dict.fromkeys(RUN_COUNTERS, 0)
+                 for stage in SHEET_STAGES}
+        timings = dict.fromkeys(SHEET_STAGES, 0.0)
+        ledger = ImportLedger(self.env.cr)
+        rows = self.rows or []
+        schema = SheetSchema(rows[0] if rows else (), self.run_id.date_formats)
+        # Fresh PTAV index, earlier chunks of the bucket may have run elsewhere
+        self.env['product.template'].import_sheet_batch(
+            rows, self.row_numbers or [], lookup_cache, stats, timings,
+            PtavIndex(self.env), full=self.full, ledger=ledger,
+            schema=schema)
+        if ledger.errors:
+            self.env['product.import.run.error'].create([
+                dict(error, run_id=self.run_id.id) for error in ledger.errors])
+        timings.update(ledger.timings, queries=ledger.query_count)
+        self.write({
+            'state': 'done',
+            'stats': stats,
+            'timings': timings,
+            'error': False,
+            'rows': False,
+            'date_done': fields.Datetime.now(),
+        })
+        _logger.info(
+            f"Import run {self.run_id.id}: chunk {self.bucket}/{self.sequence} ({self.row_count} rows) done in {time.time() - start_time:.2f} seconds, {len(ledger.errors)} row errors")
+
+    def _record_failure(self, error):
+        """Count a failed attempt in a new transaction, giving up after MAX_ATTEMPTS."""
+        self.ensure_one()
+        self.env.cr.execute("""
+            SELECT attempts FROM product_import_chunk
+             WHERE id = %s AND state = 'pending'
+               FOR UPDATE SKIP LOCKED
+        """, [self.id])
+        row = self.env.cr.fetchone()
+        if not row:
+            return
+        attempts = row[0] + 1
+        self.write({
+            'attempts': attempts,
+            'state': 'failed' if attempts >= MAX_ATTEMPTS else 'pending',
+            'error': error,
+        })
+
+    @api.model
+    def _finish_runs(self):
+        """Close the chunked runs whose chunks are all processed."""
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute("""
+                    SELECT run.id
+                      FROM product_import_run run
+                     WHERE run.state = 'running'
+                       AND EXISTS (SELECT 1 FROM product_import_chunk chunk
+                                    WHERE chunk.run_id = run.id)
+                       AND NOT EXISTS (SELECT 1 FROM product_import_chunk chunk
+                                        WHERE chunk.run_id = run.id
+                                          AND chunk.state = 'pending')
+                       FOR UPDATE SKIP LOCKED
+                """)
+                run_ids = [row[0] for row in self.env.cr.fetchall()]
+        except errors.SerializationFailure:
+            return
+        if run_ids:
+            self.env['product.import.run'].browse(run_ids).finish_chunks()
+
+    @api.model
+    def cron_process_chunks(self):
+        """Cron job claiming and processing chunks until none is left or the time budget is spent."""
+        deadline = self.env['product.import.checkpoint'].get_deadline()
+        Cache = self.env['product.import.cache']
+        Cache.get_lookup_cache()
+        # Claims start their own transaction
+        self.env.cr.commit()
+        processed = 0
+        while True:
+            chunk = self.claim()
+            if not chunk:
+                break
+            chunk_start_time = time.time()
+            try:
+                # Reloaded only when a rollback or a change dropped the tables
+                chunk.process(Cache.get_lookup_cache())
+                self.env.cr.commit()
+            except Exception as e:
+                _logger.exception(
+                    f"Import run {chunk.run_id.id}: chunk {chunk.id} failed")
+                Cache.rollback()
+                chunk._record_failure(str(e))
+                self.env.cr.commit()
+            self.env.invalidate_all()
+            processed += 1
+            chunk_elapsed_time = time.time() - chunk_start_time
+            if deadline and time.time() + chunk_elapsed_time > deadline:
+                _logger.info(
+                    f"Time budget exhausted after {processed} chunks, the workers continue on their next run")
+                self._trigger_workers()
+                break
+        self._finish_runs()
+        self.env.cr.commit()
+        return processed
+
+    @api.model
+    def cron_plan_queued_runs(self):
+        """Cron job planning the runs queued by the import wizard, one uploaded file at a time."""
+        Run = self.env['product.import.run']
+        while True:
+            self.env.cr.execute("""
+                SELECT id FROM product_import_run
+                 WHERE state = 'queued'
+                 ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+            """)
+            row = self.env.cr.fetchone()
+            if not row:
+                return
+            run = Run.browse(row[0])
+            try:
+                if run.validate_only:
+                    run.validate_attachment()
+                    self.env.cr.commit()
+                    continue
+                self.plan(run.iter_attachment_rows(), full=run.full, run=run)
+            except Exception:
+                _logger.exception(f"Import run {run.id}: planning failed")
+                self.env['product.import.cache'].rollback()
+                run.finish('failed')
+                self.env.cr.commit()
+
+    @api.model
+    def cron_plan_product_sheet(self, full=False):
+        """Cron job splitting the product sheet into chunks for the worker crons."""
+        file_path = self.env['product.template'].get_sheet_path()
+        if not os.path.exists(file_path):
+            _logger.error(f"CSV file not found at: {file_path}")
+            return
+        if not os.access(file_path, os.R_OK):
+            _logger.error(f"No read permissions for CSV file: {file_path}")
+            return
+        try:
+            return self.plan(iter_sheet_rows(file_path), full=full)
+        except Exception:
+            self.env['product.import.cache'].rollback()
+            raise
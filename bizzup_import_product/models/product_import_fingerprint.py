@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+from odoo import models, fields, api
+
+
+class ProductImportFingerprint(models.Model):
+    """Content fingerprint of the last successfully imported version of a CSV row.
+
+    Rows are keyed by S/N (or by a deterministic code for rows without one) so
+    a later run can tell unchanged rows apart without touching the ORM.
+    """
+    _name = 'product.import.fingerprint'
+    _description = 'Product Import Row Fingerprint'
+
+    stage = fields.Selection(
+        [('template', 'Product Template'), ('product', 'Product')],
+        string='Stage', required=True)
+    key = fields.Char(string='Row Key', required=True)
+    fingerprint = fields.Char(string='Fingerprint', required=True)
+
+    _sql_constraints = [
+        ('stage_key_uniq', 'unique(stage, key)',
+         'A row key can only have one fingerprint per import stage.'),
+    ]
+
+    @api.model
+    def get_fingerprints(self, stage, keys):
+        """Return the stored fingerprints of the given row keys with one query.
+
+        :return: dict {row key: fingerprint}
+        """
+        if not keys:
+            return {}
+        self.env.cr.execute("""
+            SELECT key, fingerprint
+              FROM product_import_fingerprint
+             WHERE stage = %s AND key = ANY(%s)
+        """, [stage, list(keys)])
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def store_fingerprints(self, stage, fingerprints):
+        """Insert or update the fingerprints of successfully imported rows.
+
+        :param fingerprints: dict {row key: fingerprint}
+        """
+        if not fingerprints:
+            return
+        self.env.cr.execute("""
+            INSERT INTO product_import_fingerprint
+                   (stage, key, fingerprint, create_uid, create_date,
+                    write_uid, write_date)
+            SELECT %(stage)s, row.key, row.fingerprint, %(uid)s,
+                   now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM unnest(%(keys)s, %(fingerprints)s) AS row(key, fingerprint)
+                ON CONFLICT (stage, key) DO UPDATE
+               SET fingerprint = EXCLUDED.fingerprint,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, {
+            'stage': stage,
+            'uid': self.env.uid,
+            'keys': list(fingerprints),
+            'fingerprints': list(fingerprints.values()),
+        })
+        self.invalidate_model()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+from odoo import models, fields, api
+
+
+class ProductImportName(models.Model):
+    """Claim on the natural key of a record the importers get or create.
+
+    Categories, attributes, attribute values and suppliers have no unique
+    name in the database. Before searching for one the importers upsert its
+    (model, name) row here: the unique index makes concurrent importers wait
+    for each other, and a transaction whose snapshot predates the commit of
+    another one fails with a serialization error instead of creating the
+    record a second time.
+    """
+    _name = 'product.import.name'
+    _description = 'Product Import Shared Record Name'
+
+    model = fields.Char(string='Model', required=True)
+    name = fields.Char(string='Name', required=True)
+    res_id = fields.Integer(string='Record ID')
+
+    _sql_constraints = [
+        ('model_name_uniq', 'unique(model, name)',
+         'A name can only be claimed once per model.'),
+    ]
+
+    @api.model
+    def get_or_create(self, model_name, name, search, create):
+        """Return the id of the record of a natural key, creating it at most once.
+
+        :param model_name: model of the record
+        :param name: natural key of the record in that model
+        :param search: callable returning the existing record, if any
+        :param create: callable creating the record
+        """
+        # Locks the claim until the transaction ends
+        self.env.cr.execute("""
+            INSERT INTO product_import_name AS claim
+                   (model, name, create_uid, create_date, write_uid, write_date)
+            VALUES (%(model)s, %(name)s, %(uid)s, now() at time zone 'UTC',
+                    %(uid)s, now() at time zone 'UTC')
+                ON CONFLICT (model, name) DO UPDATE
+               SET write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            RETURNING claim.id, claim.res_id
+        """, {'model': model_name, 'name': name, 'uid': self.env.uid})
+        claim_id, res_id = self.env.cr.fetchone()
+        record = self.env[model_name].browse(res_id).exists() if res_id else None
+        if not record:
+            record = search() or create()
+            self.env.cr.execute(
+                "UPDATE product_import_name SET res_id = %s WHERE id = %s",
+                [record.id, claim_id])
+        return record.id
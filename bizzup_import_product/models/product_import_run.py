@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import io
+import logging
+
+from odoo import models, fields, api
+
+from ..utils.csv_stream import iter_csv_bytes, iter_csv_rows
+from ..utils.xlsx_stream import is_xlsx, iter_xlsx_rows
+
+_logger = logging.getLogger(__name__)
+
+# Integer counters of a run, as kept in the import stats
+RUN_COUNTERS = ('created', 'updated', 'skipped', 'failed', 'unchanged')
+
+
+class ProductImportRun(models.Model):
+    """Ledger of an import job: counters, timings and row errors.
+
+    Updated once per batch in the same transaction as the batch, replacing the
+    per-row log lines of the importers. A resumed job keeps adding to the run
+    of its checkpoint.
+    """
+    _name = 'product.import.run'
+    _description = 'Product Import Run'
+    _order = 'date_start desc, id desc'
+
+    name = fields.Char(string='Job', required=True)
+    state = fields.Selection(
+        [('queued', 'Queued'), ('running', 'Running'), ('paused', 'Paused'),
+         ('done', 'Done'), ('failed', 'Failed')],
+        string='Status', required=True, default='running')
+    date_start = fields.Datetime(string='Started', required=True,
+                                 default=fields.Datetime.now)
+    date_end = fields.Datetime(string='Ended')
+    rows_done = fields.Integer(string='Rows Done')
+    created = fields.Integer(string='Created')
+    updated = fields.Integer(string='Updated')
+    skipped = fields.Integer(string='Skipped')
+    failed = fields.Integer(string='Failed')
+    unchanged = fields.Integer(string='Unchanged')
+    stats = fields.Json(string='Statistics')
+    lookup_time = fields.Float(string='Lookup Time (s)', digits=(16, 2))
+    create_time = fields.Float(string='Create Time (s)', digits=(16, 2))
+    commit_time = fields.Float(string='Commit Time (s)', digits=(16, 2))
+    query_count = fields.Integer(string='Queries')
+    error_ids = fields.One2many('product.import.run.error', 'run_id',
+                                string='Row Errors')
+    chunk_ids = fields.One2many('product.import.chunk', 'run_id',
+                                string='Chunks')
+    attachment_id = fields.Many2one('ir.attachment', string='File',
+                                    ondelete='set null')
+    full = fields.Boolean(string='Full Import')
+    rows_total = fields.Integer(string='Rows')
+    date_formats = fields.Json(string='Date Formats')
+    bucket_count = fields.Integer(string='Buckets')
+    validate_only = fields.Boolean(string='Validation Only')
+    report = fields.Text(string='Validation Report', readonly=True)
+    progress_rows = fields.Integer(string='Rows Processed',
+                                   compute='_compute_progress')
+    progress = fields.Float(string='Progress (%)', compute='_compute_progress')
+    rows_per_second = fields.Float(string='Rows/s', digits=(16, 1),
+                                   compute='_compute_progress')
+    eta = fields.Char(string='Time Left', compute='_compute_progress')
+
+    @api.depends('state', 'rows_done', 'rows_total', 'date_start', 'date_end')
+    def _compute_progress(self):
+        """Rows processed, rate and time left; chunked runs count their processed chunks."""
+        chunk_rows = {}
+        chunked_runs = self.filtered(lambda run: run.rows_total and run.id)
+        if chunked_runs:
+            chunk_rows = {
+                run.id: row_count
+                for run, row_count in self.env['product.import.chunk']._read_group(
+                    [('run_id', 'in', chunked_runs.ids),
+                     ('state', '!=', 'pending')],
+                    ['run_id'], ['row_count:sum'])}
+        now = fields.Datetime.now()
+        for run in self:
+            rows = chunk_rows.get(run.id, 0) if run.rows_total else run.rows_done
+            elapsed = ((run.date_end or now) - run.date_start).total_seconds() \
+                if run.date_start and run.state != 'queued' else 0
+            rate = rows / elapsed if elapsed > 0 else 0.0
+            run.progress_rows = rows
+            run.progress = 100.0 * rows / run.rows_total if run.rows_total else 0.0
+            run.rows_per_second = rate
+            run.eta = False
+            if run.state == 'running' and run.rows_total and rate:
+                seconds = int((run.rows_total - rows) / rate)
+                run.eta = f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+    def action_refresh(self):
+        """Reload the form to show the current progress of the run."""
+        return True
+
+    def iter_attachment_rows(self):
+        """Yield the rows of the uploaded CSV or XLSX file of the run, streamed from the filestore when possible."""
+        self.ensure_one()
+        attachment = self.attachment_id.sudo()
+        path = attachment.store_fname and attachment._full_path(
+            attachment.store_fname)
+        if is_xlsx(attachment.name, attachment.mimetype):
+            return iter_xlsx_rows(path or io.BytesIO(attachment.raw or b''))
+        if path:
+            return iter_csv_rows(path)
+        return iter_csv_bytes(attachment.raw or b'')
+
+    def validate_attachment(self):
+        """Validate the uploaded file of a queued run, streaming its rows, and store the report."""
+        self.ensure_one()
+        self.write({'state': 'running', 'date_start': fields.Datetime.now()})
+        Validation = self.env['product.import.validation']
+        report = Validation.validate_sheet(self.iter_attachment_rows(),
+                                           full=self.full)
+        self.write({'report': Validation.format_report(report),
+                    'rows_done': report['rows']})
+        self.finish('done')
+
+    @api.model
+    def start(self, job, checkpoint=None):
+        """Return the run of a resumed checkpoint, or a new running one."""
+        run = checkpoint.run_id if checkpoint else self.browse()
+        if run:
+            run.write({'state': 'running', 'date_end': False})
+            return run
+        run = self.create({'name': job})
+        if checkpoint:
+            checkpoint.run_id = run
+        return run
+
+    def _flush_ledger(self, ledger):
+        """Add the timings, queries and errors of a ledger to the run and reset it."""
+        vals = {
+            'lookup_time': self.lookup_time + ledger.timings['lookup'],
+            'create_time': self.create_time + ledger.timings['create'],
+            'commit_time': self.commit_time + ledger.timings['commit'],
+            'query_count': self.query_count + ledger.query_count,
+        }
+        if ledger.errors:
+            self.env['product.import.run.error'].create([
+                dict(error, run_id=self.id) for error in ledger.errors])
+        ledger.reset()
+        return vals
+
+    def record_batch(self, ledger, rows_done, stats, elapsed_time=0.0):
+        """Store the counters of the run, flush the ledger and log one summary line.
+
+        :param ledger: :class:`ImportLedger` of the batch, reset afterwards
+        :param stats: counters of the run, or counters per stage
+        :param elapsed_time: wall time of the batch, for the log line
+        """
+        self.ensure_one()
+        error_count = len(ledger.errors)
+        # The single pass import keeps one set of counters per stage
+        if stats and all(isinstance(value, dict) for value in stats.values()):
+            stages = list(stats.values())
+        else:
+            stages = [stats]
+        totals = {counter: sum(stage.get(counter, 0) for stage in stages)
+                  for counter in RUN_COUNTERS}
+        self.write(dict(totals, rows_done=rows_done, stats=stats,
+                        **self._flush_ledger(ledger)))
+        _logger.info(
+            f"Import run {self.id} ({self.name}): {rows_done} rows done, batch in {elapsed_time:.2f} seconds, Created={totals['created']}, Updated={totals['updated']}, Skipped={totals['skipped']}, Failed={totals['failed']}, Unchanged={totals['unchanged']}, {error_count} new row errors")
+
+    def finish(self, state='done', ledger=None):
+        """Close the run, adding what the ledger collected since the last batch."""
+        vals = {'state': state, 'date_end': fields.Datetime.now()}
+        if ledger is not None:
+            vals.update(self._flush_ledger(ledger))
+        self.write(vals)
+
+    def finish_chunks(self):
+        """Close chunked runs with the counters and timings summed over their chunks.
+
+        Chunks only write their own row while workers run, the run is
+        updated once by the worker that finds all its chunks processed.
+        """
+        for run in self:
+            stats = {}
+            timings = {}
+            rows_done = 0
+            has_failed = False
+            for chunk in self.env['product.import.chunk'].search_read(
+                    [('run_id', '=', run.id)],
+                    ['state', 'row_count', 'stats', 'timings']):
+                has_failed = has_failed or chunk['state'] == 'failed'
+                if chunk['state'] != 'done':
+                    continue
+                rows_done += chunk['row_count']
+                for stage, counters in (chunk['stats'] or {}).items():
+                    stage_stats = stats.setdefault(stage, {})
+                    for counter, count in counters.items():
+                        stage_stats[counter] = stage_stats.get(counter, 0) + count
+                for name, value in (chunk['timings'] or {}).items():
+                    timings[name] = timings.get(name, 0) + value
+            totals = {counter: sum(stage.get(counter, 0)
+                                   for stage in stats.values())
+                      for counter in RUN_COUNTERS}
+            run.write(dict(
+                totals,
+                state='failed' if has_failed else 'done',
+                date_end=fields.Datetime.now(),
+                rows_done=rows_done,
+                stats=stats,
+                lookup_time=timings.get('lookup', 0.0),
+                create_time=timings.get('create', 0.0),
+                commit_time=timings.get('commit', 0.0),
+                query_count=int(timings.get('queries', 0)),
+            ))
+            _logger.info(
+                f"Import run {run.id} ({run.name}): {rows_done} rows done, Created={totals['created']}, Updated={totals['updated']}, Skipped={totals['skipped']}, Failed={totals['failed']}, Unchanged={totals['unchanged']}")
+
+
+class ProductImportRunError(models.Model):
+    _name = 'product.import.run.error'
+    _description = 'Product Import Row Error'
+    _order = 'run_id, row_number, id'
+
+    run_id = fields.Many2one('product.import.run', string='Run',
+                             required=True, ondelete='cascade', index=True)
+    stage = fields.Selection(
+        [('template', 'Product Template'), ('product', 'Product'),
+         ('lot', 'Lot')],
+        string='Stage', required=True)
+    row_number = fields.Integer(string='Row')
+    key = fields.Char(string='S/N')
+    message = fields.Text(string='Message')
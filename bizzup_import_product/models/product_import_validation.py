@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+import time
+
+from odoo import models, api
+
+from ..utils.csv_stream import SKIP_ROWS, iter_batches, number_rows, peek_row, skip_rows
+from ..utils.sheet_schema import (DATE_COLUMNS, PRODUCT_HEADERS, SheetSchema,
+                                  clean_value, name_match_key)
+
+_logger = logging.getLogger(__name__)
+
+# Rejected rows listed in a validation report, the others are only counted
+MAX_ISSUES = 500
+
+
+class ProductImportValidation(models.AbstractModel):
+    """Read-only pre-flight pass over a product sheet.
+
+    Decodes every row once and resolves templates, products, lots and row
+    fingerprints with one query per batch, then reports what the single pass
+    import would create, update or skip, and which rows it would reject.
+    Nothing is written to the database.
+    """
+    _name = 'product.import.validation'
+    _description = 'Product Import Validation'
+
+    @api.model
+    def validate_sheet(self, csv_data, full=False, batch_size=None,
+                       max_issues=MAX_ISSUES):
+        """Validate a product sheet without importing it.
+
+        :param csv_data: iterable of sheet rows as dicts, consumed lazily
+        :param full: ignore the stored fingerprints, like a full import
+        :param batch_size: rows per lookup batch, see ``get_import_batch_size``
+        :param max_issues: rejected rows listed in the report
+        :return: report dict with the counters per stage, the new lookup
+                 records, the rejected rows per reason and the first issues
+        """
+        start_time = time.time()
+        first_row, csv_data = peek_row(csv_data)
+        schema = SheetSchema(first_row or ())
+        report = {
+            'rows': 0,
+            'missing_headers': sorted(schema.missing_headers(PRODUCT_HEADERS)
+                                      if first_row else PRODUCT_HEADERS),
+            'template': {'created': 0, 'updated': 0},
+            'product': {'created': 0, 'skipped': 0, 'unchanged': 0},
+            'lot': {'created': 0, 'skipped': 0},
+            'new': {'categories': 0, 'attributes': 0, 'values': 0,
+                    'suppliers': 0},
+            'rejected': 0,
+            'reasons': {},
+            'issues': [],
+            'duration': 0.0,
+        }
+        if report['missing_headers']:
+            return report
+
+        Template = self.env['product.template']
+        batch_size = batch_size or Template.get_import_batch_size()
+        lookup_cache = self.env['product.import.cache'].get_lookup_cache()
+        statuses = {value for value, _label in
+                    self.env['product.product']._fields['status'].selection}
+        templates = {}
+        serials = set()
+        new_names = {name: set() for name in report['new']}
+        total_rows = 0
+        for batch in iter_batches(skip_rows(csv_data, SKIP_ROWS), batch_size):
+            rows = [(row_number, row, schema.decode(row)) for row_number, row
+                    in number_rows(batch, total_rows + 1)]
+            total_rows += len(batch)
+
+            # Existing templates, products, lots and fingerprints of the batch
+            titles = {data['product_title'] for _n, _row, data in rows
+                      if name_match_key(data['product_title']) not in templates}
+            matched = Template._match_templates_by_title(titles)
+            for title in titles:
+                templates.setdefault(name_match_key(title), title in matched)
+            codes = {data['default_code'] for _n, _row, data in rows}
+            lot_serials = {schema.serial_number(row) for _n, row, _data in rows
+                           if schema.serial_number(row)}
+            products = self.env['product.product'].find_by_serials(
+                codes | lot_serials)
+            lots = self.env['stock.lot']._find_serial_lots(
+                {serial: products[serial] for serial in lot_serials
+                 if serial in products})
+            fingerprints = {} if full else self.env[
+                'product.import.fingerprint'].get_fingerprints('product', codes)
+
+            for row_number, row, data in rows:
+                default_code = data['default_code']
+                problems = self._check_row(row, data, statuses)
+                if default_code in serials:
+                    problems.append(('duplicate S/N',
+                                     f"S/N {default_code} appears on an earlier row"))
+                if problems:
+                    report['rejected'] += 1
+                    for reason, message in problems:
+                        report['reasons'][reason] = report['reasons'].get(reason, 0) + 1
+                        if len(report['issues']) < max_issues:
+                            report['issues'].append({
+                                'row_number': row_number,
+                                'key': default_code,
+                                'reason': reason,
+                                'message': message,
+                            })
+                    continue
+                serials.add(default_code)
+                self._count_new_names(data, lookup_cache, new_names)
+
+                product_id = products.get(default_code)
+                if fingerprints.get(default_code) == schema.fingerprint(row):
+                    report['product']['unchanged'] += 1
+                elif product_id:
+                    report['product']['skipped'] += 1
+                else:
+                    report['product']['created'] += 1
+
+                serial_number = schema.serial_number(row)
+                if not serial_number or serial_number in lots:
+                    report['lot']['skipped'] += 1
+                else:
+                    report['lot']['created'] += 1
+
+        report['rows'] = total_rows
+        report['template']['updated'] = sum(templates.values())
+        report['template']['created'] = len(templates) - report['template']['updated']
+        report['new'] = {name: len(names) for name, names in new_names.items()}
+        report['duration'] = time.time() - start_time
+        _logger.info(
+            f"Validated product sheet ({total_rows} rows) in {report['duration']:.2f} seconds: {report['rejected']} rejected rows, templates {report['template']}, products {report['product']}, lots {report['lot']}")
+        return report
+
+    def _check_row(self, row, data, statuses):
+        """Return the (reason, message) of every problem the import would hit on a row."""
+        problems = []
+        for column, value in row.items():
+            if isinstance(value, str) and value.strip().upper() == '#REF!':
+                problems.append(('#REF! cell', f"Broken reference (#REF!) in column {column}"))
+        if not clean_value(row.get('Product Title')):
+            problems.append(('missing title', "Product Title is empty"))
+        status = data['status']
+        if status and status not in statuses:
+            problems.append(('invalid status', f"Unknown status {status}"))
+        for field_name, column in DATE_COLUMNS.items():
+            if clean_value(row.get(column)) and not data[field_name]:
+                problems.append(('unknown date',
+                                 f"Unreadable date {row.get(column)} in column {column}"))
+        return problems
+
+    def _count_new_names(self, data, lookup_cache, new_names):
+        """Collect the categories, attributes, values and suppliers the import would create."""
+        category_name = data['category_name'] or 'Miscellaneous'
+        if category_name not in lookup_cache.categories:
+            new_names['categories'].add(category_name)
+        supplier_name = data['supplier_name']
+        if supplier_name and supplier_name not in lookup_cache.suppliers:
+            new_names['suppliers'].add(supplier_name)
+        for attr_name, attr_value in data['attributes'].items():
+            attr_id = lookup_cache.attributes.get(attr_name)
+            if not attr_id:
+                new_names['attributes'].add(attr_name)
+            if not attr_id or (attr_id, attr_value) not in lookup_cache.values:
+                new_names['values'].add((attr_name, attr_value))
+
+    @api.model
+    def format_report(self, report):
+        """Render a validation report as plain text lines."""
+        if report['missing_headers']:
+            return f"Missing columns: {', '.join(report['missing_headers'])}"
+        lines = [
+            f"Rows: {report['rows']} ({report['rejected']} rejected), validated in {report['duration']:.1f} seconds",
+            "Templates: {created} to create, {updated} to update".format(**report['template']),
+            "Products: {created} to create, {skipped} existing, {unchanged} unchanged".format(**report['product']),
+            "Lots: {created} to create, {skipped} skipped".format(**report['lot']),
+            "New records: {categories} categories, {attributes} attributes, {values} values, {suppliers} suppliers".format(**report['new']),
+        ]
+        if report['reasons']:
+            lines.append("Rejected rows: " + ', '.join(
+                f"{reason}={count}" for reason, count in sorted(report['reasons'].items())))
+        lines += [f"Row {issue['row_number']} ({issue['key']}): {issue['message']}"
+                  for issue in report['issues']]
+        return '\n'.join(lines)
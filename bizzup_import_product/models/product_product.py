@@ -5,15 +5,50 @@
 # Proprietary and confidential for more information, please contact
 # lg@bizzup.app
 
-from odoo import models, fields
+from odoo import api, models, fields
+
+# Separates the serial discriminator from the attribute values in
+# combination_indices of the variants of by_pass_variant_creation templates
+SERIAL_DISCRIMINATOR = '|sn:'
 
 
 class ProductProduct(models.Model):
     _inherit = 'product.product'
 
-
     def init(self):
-        return False
+        """Give the existing one-unit variants their serial discriminator
+        before the core ``product_product_combination_unique`` index is
+        (re)created. Duplicated S/Ns of a template are told apart by id, and
+        so are the variants without S/N that share a combination."""
+        self.env.cr.execute("""
+            UPDATE product_product product
+               SET combination_indices = serial.combination_indices
+              FROM (
+                    SELECT variant.id,
+                           COALESCE(variant.combination_indices, '')
+                           || CASE WHEN COALESCE(variant.default_code, '') <> ''
+                                   THEN %(discriminator)s || variant.default_code
+                                   ELSE '' END
+                           || CASE WHEN row_number() OVER (
+                                        PARTITION BY variant.product_tmpl_id,
+                                                     COALESCE(variant.combination_indices, ''),
+                                                     COALESCE(variant.default_code, '')
+                                        ORDER BY variant.id) > 1
+                                   THEN '#' || variant.id ELSE '' END
+                           AS combination_indices
+                      FROM product_product variant
+                      JOIN product_template template
+                        ON template.id = variant.product_tmpl_id
+                     WHERE template.by_pass_variant_creation
+                       AND position(%(discriminator)s in
+                                    COALESCE(variant.combination_indices, '')) = 0
+                       AND position('#' in
+                                    COALESCE(variant.combination_indices, '')) = 0
+                   ) serial
+             WHERE product.id = serial.id
+               AND product.combination_indices IS DISTINCT FROM serial.combination_indices
+        """, {'discriminator': SERIAL_DISCRIMINATOR})
+        return super().init()
 
 
     status = fields.Selection(
@@ -33,3 +68,66 @@ class ProductProduct(models.Model):
     date_order = fields.Date(string='Date Ordered')
     arrival_date = fields.Date(string='Arrival Date')
     sold_date = fields.Date(string='Sold Date')
+
+    @api.model
+    def get_serial_combination_indices(self, ptav_ids, serial_number):
+        """Return the combination_indices of a one-unit variant.
+
+        Variants of ``by_pass_variant_creation`` templates share their
+        attribute values, the S/N keeps them apart in the core
+        ``product_product_combination_unique`` index. Passing the value in
+        the create values also spares the recomputation of the combination.
+
+        :param ptav_ids: ids of the product.template.attribute.value records
+        :param serial_number: S/N of the variant
+        """
+        combination_indices = ','.join(str(ptav_id) for ptav_id in sorted(ptav_ids))
+        if not serial_number:
+            return combination_indices
+        return f"{combination_indices}{SERIAL_DISCRIMINATOR}{serial_number}"
+
+    @api.depends('product_template_attribute_value_ids', 'default_code',
+                 'product_tmpl_id.by_pass_variant_creation')
+    def _compute_combination_indices(self):
+        # Variants told apart by id (see init) keep their suffix
+        suffixed = set()
+        stored_ids = [product_id for product_id in self.ids if isinstance(product_id, int)]
+        if stored_ids:
+            self.env.cr.execute("""
+                SELECT id FROM product_product
+                 WHERE id = ANY(%s)
+                   AND combination_indices LIKE '%%#' || id
+            """, [stored_ids])
+            suffixed = {row[0] for row in self.env.cr.fetchall()}
+        super()._compute_combination_indices()
+        for product in self:
+            if product.product_tmpl_id.by_pass_variant_creation:
+                combination_indices = product.get_serial_combination_indices(
+                    product.product_template_attribute_value_ids.ids,
+                    product.default_code)
+                if product.id in suffixed:
+                    combination_indices = f"{combination_indices}#{product.id}"
+                product.combination_indices = combination_indices
+
+    @api.model
+    def find_by_serials(self, serials):
+        """Return the products carrying serial numbers as internal reference.
+
+        One query on the indexed ``default_code``, so products created or
+        renamed outside the import are found as well. When several active
+        products share a S/N, the oldest one wins.
+
+        :return: dict {serial: product id}, only for the serials found
+        """
+        serials = [serial for serial in serials if serial]
+        if not serials:
+            return {}
+        self.flush_model(['default_code', 'active'])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (default_code) default_code, id
+              FROM product_product
+             WHERE default_code = ANY(%s)
+               AND active
+             ORDER BY default_code, id
+        """, [serials])
+        return dict(self.env.cr.fetchall())
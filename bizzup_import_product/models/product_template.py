@@ -5,27 +5,44 @@
 # Proprietary and confidential for more information, please contact
 # lg@bizzup.app
 
-import csv
 import logging
 import os
-import re
 import time
-import uuid
-from datetime import datetime, timedelta
 
 from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
 
+from ..utils.attribute_delta import AttributeDelta
+from ..utils.csv_stream import (SKIP_ROWS, iter_batches, iter_sheet_rows,
+                                number_rows,
+                                peek_row, skip_rows)
+from ..utils.import_ledger import ImportLedger, report_row_error, timed
+from ..utils.ptav_index import PtavIndex
+from ..utils.sheet_schema import (PRODUCT_HEADERS, TEMPLATE_HEADERS,
+                                  SheetSchema, clean_value, name_match_key,
+                                  parse_date, parse_product_name,
+                                  parse_sale_price, row_fingerprint, row_key)
+
 _logger = logging.getLogger(__name__)
 
+# Rows per chunk, and per commit unless rows are committed one by one
+CHUNK_SIZE = 500
+
 
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
     _description = 'Product Template with CSV Import'
 
     by_pass_variant_creation = fields.Boolean()
+    import_match_key = fields.Char(
+        string='Import Match Key', compute='_compute_import_match_key',
+        store=True, index=True,
+        help="Normalized English name the CSV import matches product titles on.")
 
-
+    @api.depends('name')
+    def _compute_import_match_key(self):
+        for template in self.with_context(lang='en_US'):
+            template.import_match_key = name_match_key(template.name)
 
     def _create_variant_ids(self):
         if not self.by_pass_variant_creation:
@@ -33,52 +50,68 @@ class ProductTemplate(models.Model):
 
     def clean_value(self, value):
         """Clean input value by trimming and handling empty or invalid values."""
-        if (value is None or value == '' or value == '#N/A' or value ==
-            '#ref!') or value == 'None':
-            return False
-        if isinstance(value, str):
-            cleaned = value.strip().replace('"', '')
-            return cleaned if cleaned else False
-        return value
+        return clean_value(value)
 
     def parse_sale_price(self, price_str):
         """Parse sale price by removing currency symbols and converting to float."""
-        if not price_str or price_str == '':
-            return 0.0
-        try:
-            cleaned_price = re.sub(r'[^\d,.]', '', price_str).replace(',', '')
-            return float(cleaned_price)
-        except (ValueError, TypeError):
-            _logger.warning(f"Invalid sale price format: {price_str}")
-            return 0.0
+        return parse_sale_price(price_str)
 
     def parse_date(self, date_str):
         """Parse date string or Excel serial date to Odoo date format, supporting multiple formats."""
-        if not date_str or date_str == '':
-            return False
-        try:
-            # Handle Excel serial date numbers (e.g., 44180)
-            if isinstance(date_str, (int, float)) or str(date_str).isdigit():
-                excel_epoch = datetime(1899, 12, 30)
-                parsed_date = excel_epoch + timedelta(days=float(date_str))
-                return parsed_date.date()
-            # Try multiple date formats
-            date_formats = ['%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d']
-            for date_format in date_formats:
-                try:
-                    parsed_date = datetime.strptime(date_str,
-                                                    date_format).date()
-                    return parsed_date
-                except ValueError:
-                    continue
-            _logger.warning(f"Invalid date format: {date_str}")
-            return False
-        except (ValueError, TypeError):
-            _logger.warning(f"Invalid date format: {date_str}")
-            return False
+        return parse_date(date_str)
+
+    @api.model
+    def get_import_batch_size(self, commit_per_row=False):
+        """Rows per chunk of the importers.
+
+        Set with the ``bizzup_import_product.batch_size`` system parameter,
+        defaults to 50 rows when committing every row and 500 otherwise.
+        """
+        default = 50 if commit_per_row else CHUNK_SIZE
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'bizzup_import_product.batch_size', default)) or default
+
+    @api.model
+    def get_sheet_path(self):
+        """Path of the product sheet read by the import crons.
+
+        Set with the ``bizzup_import_product.sheet_path`` system parameter
+        to a CSV or XLSX file, defaults to the CSV shipped with the module.
+        """
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'bizzup_import_product.sheet_path') or tools.misc.file_path(
+            "bizzup_import_product/Product Data - Sheet.csv")
+
+    def mark_lookup_caches(self, *caches):
+        """Return the state of lookup caches before a savepoint, see :meth:`reset_lookup_caches`."""
+        return [None if cache is None
+                else cache.mark() if isinstance(cache, PtavIndex)
+                else len(cache)
+                for cache in caches]
+
+    def reset_lookup_caches(self, marks, *caches):
+        """Forget the ids cached since ``marks`` after a savepoint rollback, the records they point to are gone.
+
+        The ``get_or_create_*`` methods only ever add names to their tables,
+        so the entries of the savepoint are the last ones inserted; entries
+        preloaded or added before it are kept.
+
+        :param marks: result of :meth:`mark_lookup_caches` on the same caches
+        """
+        for cache, mark in zip(caches, marks):
+            if cache is None:
+                continue
+            if isinstance(cache, PtavIndex):
+                cache.rollback(mark)
+                continue
+            while len(cache) > mark:
+                cache.popitem()
 
     def get_or_create_category(self, category_name, category_cache):
-        """Get or create a product category, using cache to avoid repeated queries."""
+        """Get or create a product category, using cache to avoid repeated queries.
+
+        Concurrent imports create it once, see ``product.import.name``.
+        """
         if not category_name:
             category_name = 'Miscellaneous'  # Default category
             _logger.debug(
@@ -87,65 +120,91 @@ class ProductTemplate(models.Model):
             _logger.debug(
                 f"Category cache hit: {category_name} (ID: {category_cache[category_name]})")
             return category_cache[category_name]
-        category = self.env['product.category'].search(
-            [('name', '=', category_name)], limit=1)
-        if not category:
-            category = self.env['product.category'].create({
+        Category = self.env['product.category']
+
+        def create():
+            category = Category.create({
                 'name': category_name,
                 'parent_id': False,
             })
             _logger.debug(
                 f"Created new category: {category_name} (ID: {category.id})")
-        category_cache[category_name] = category.id
-        return category.id
+            return category
+
+        category_id = self.env['product.import.name'].get_or_create(
+            'product.category', category_name,
+            lambda: Category.search([('name', '=', category_name)], limit=1),
+            create)
+        category_cache[category_name] = category_id
+        return category_id
 
     def get_or_create_supplier(self, supplier_name, supplier_cache):
-        """Get or create a supplier (res.partner), using cache to avoid repeated queries."""
+        """Get or create a supplier (res.partner), using cache to avoid repeated queries.
+
+        Concurrent imports create it once, see ``product.import.name``.
+        """
         if not supplier_name:
             return False
         if supplier_name in supplier_cache:
             _logger.debug(
                 f"Supplier cache hit: {supplier_name} (ID: {supplier_cache[supplier_name]})")
             return supplier_cache[supplier_name]
-        supplier = self.env['res.partner'].search(
-            ['|', ('name', '=', supplier_name),
-             ('name', '=', supplier_name.lower()),
-             ('supplier_rank', '>', 0)],
-            limit=1)
-        if not supplier:
-            supplier = self.env['res.partner'].create({
+        Partner = self.env['res.partner']
+
+        def create():
+            supplier = Partner.create({
                 'name': supplier_name,
                 'supplier_rank': 1,
             })
             _logger.debug(
                 f"Created new supplier: {supplier_name} (ID: {supplier.id})")
-        supplier_cache[supplier_name] = supplier.id
-        return supplier.id
+            return supplier
+
+        supplier_id = self.env['product.import.name'].get_or_create(
+            'res.partner', supplier_name.lower(),
+            lambda: Partner.search(
+                ['|', ('name', '=', supplier_name),
+                 ('name', '=', supplier_name.lower()),
+                 ('supplier_rank', '>', 0)],
+                limit=1),
+            create)
+        supplier_cache[supplier_name] = supplier_id
+        return supplier_id
 
     def get_or_create_attribute(self, attribute_name, value, attribute_cache,
                                 value_cache):
-        """Get or create a product attribute and its value, using caches, without creating variants."""
+        """Get or create a product attribute and its value, using caches, without creating variants.
+
+        Concurrent imports create them once, see ``product.import.name``.
+        """
         if not value or not attribute_name:
             return False, False
+        Name = self.env['product.import.name']
         # Check attribute cache
         if attribute_name in attribute_cache:
             attr_id = attribute_cache[attribute_name]
             _logger.debug(
                 f"Attribute cache hit: {attribute_name} (ID: {attr_id})")
         else:
-            attribute = self.env['product.attribute'].search(
-                ['|', ('name', '=', attribute_name),
-                 ('name', '=', attribute_name.lower())], limit=1)
-            if not attribute:
-                attribute = self.env['product.attribute'].create({
+            Attribute = self.env['product.attribute']
+
+            def create_attribute():
+                attribute = Attribute.create({
                     'name': attribute_name,
                     'create_variant': 'no_variant',
                     # Prevent variant creation
                 })
                 _logger.debug(
                     f"Created new attribute: {attribute_name} (ID: {attribute.id})")
-            attribute_cache[attribute_name] = attribute.id
-            attr_id = attribute.id
+                return attribute
+
+            attr_id = Name.get_or_create(
+                'product.attribute', attribute_name.lower(),
+                lambda: Attribute.search(
+                    ['|', ('name', '=', attribute_name),
+                     ('name', '=', attribute_name.lower())], limit=1),
+                create_attribute)
+            attribute_cache[attribute_name] = attr_id
 
         # Check value cache
         cache_key = (attr_id, value)
@@ -153,29 +212,60 @@ class ProductTemplate(models.Model):
             _logger.debug(
                 f"Attribute value cache hit: {value} for {attribute_name} (ID: {value_cache[cache_key]})")
             return attr_id, value_cache[cache_key]
-        value_obj = self.env['product.attribute.value'].search([
-            ('attribute_id', '=', attr_id),
-            ('name', '=', value)
-        ], limit=1)
-        if not value_obj:
-            value_obj = self.env['product.attribute.value'].create({
+        Value = self.env['product.attribute.value']
+
+        def create_value():
+            value_obj = Value.create({
                 'attribute_id': attr_id,
                 'name': value,
             })
             _logger.debug(
                 f"Created new attribute value: {value} for {attribute_name} (ID: {value_obj.id})")
-        value_cache[cache_key] = value_obj.id
-        return attr_id, value_obj.id
+            return value_obj
+
+        value_id = Name.get_or_create(
+            'product.attribute.value', f"{attr_id}:{value}",
+            lambda: Value.search([
+                ('attribute_id', '=', attr_id),
+                ('name', '=', value)
+            ], limit=1),
+            create_value)
+        value_cache[cache_key] = value_id
+        return attr_id, value_id
 
     def update_product_template_attributes(self, product_template, attributes,
-                                           attribute_cache, value_cache):
-        """Update product template attributes, preventing duplicates."""
+                                           attribute_cache, value_cache,
+                                           ptav_index=None, delta=None,
+                                           row_number=None):
+        """Update product template attributes, preventing duplicates.
+
+        :param ptav_index: optional :class:`PtavIndex` refreshed for the
+                           template when lines or values are added
+        :param delta: optional :class:`AttributeDelta` recording the values
+                      to add instead of writing them, the caller applies
+                      it once per batch
+        :param row_number: row adding the values, reported by the delta
+        """
         _logger.debug(
             f"Updating attributes for product: {product_template.name} (ID: {product_template.id})")
+        if delta is not None:
+            additions = []
+            for attr_name, attr_value in attributes.items():
+                attr_id, value_id = self.get_or_create_attribute(
+                    attr_name, attr_value, attribute_cache, value_cache)
+                if not attr_id or not value_id:
+                    _logger.debug(
+                        f"Skipping invalid attribute {attr_name} with value {attr_value} for {product_template.name}")
+                    continue
+                additions.append((attr_id, value_id))
+            # Recorded once every value resolved, a failing row adds nothing
+            delta.add(product_template.id, additions, row_number)
+            return
         existing_lines = product_template.attribute_line_ids
         existing_attribute_ids = set(existing_lines.mapped('attribute_id.id'))
         existing_value_map = {line.attribute_id.id: set(line.value_ids.ids)
                               for line in existing_lines}
+        lines_changed = False
 
         for attr_name, attr_value in attributes.items():
             attr_id, value_id = self.get_or_create_attribute(attr_name,
@@ -197,6 +287,7 @@ class ProductTemplate(models.Model):
                     continue
                 # Update existing line with new value
                 line.value_ids = [(4, value_id)]
+                lines_changed = True
                 _logger.debug(
                     f"Updated attribute {attr_name} with value {attr_value} for {product_template.name} (Attribute ID: {attr_id}, Value ID: {value_id})")
             else:
@@ -206,359 +297,743 @@ class ProductTemplate(models.Model):
                     'attribute_id': attr_id,
                     'value_ids': [(6, 0, [value_id])],
                 })
+                lines_changed = True
                 _logger.debug(
                     f"Added attribute {attr_name} with value {attr_value} to {product_template.name} (Attribute ID: {attr_id}, Value ID: {value_id})")
 
+        if lines_changed and ptav_index is not None:
+            ptav_index.refresh(product_template.ids)
+
+    def get_row_fingerprint(self, data):
+        """Hash the normalized content of a CSV row."""
+        return row_fingerprint(data)
+
+    def get_row_key(self, data):
+        """Return the S/N of a CSV row, or a code derived from its content when it has none.
+
+        The fallback code is deterministic so the same row maps to the same
+        product (and fingerprint) on every run.
+        """
+        return row_key(data)
+
+    def filter_changed_rows(self, stage, batch, start_row, full=False,
+                            schema=None):
+        """Drop the rows of a batch whose content did not change since the last successful import.
+
+        :param stage: fingerprint stage, 'template' or 'product'
+        :param full: keep every row, ignoring the stored fingerprints
+        :param schema: :class:`SheetSchema` of the sheet, built from the
+                       batch when not given
+        :return: list of (row number, row key, row, fingerprint) to import
+        """
+        schema = schema or SheetSchema(batch[0] if batch else ())
+        keyed_rows = [
+            (row_number, schema.key(row), row, schema.fingerprint(row))
+            for row_number, row in number_rows(batch, start_row)]
+        if full:
+            return keyed_rows
+        stored = self.env['product.import.fingerprint'].get_fingerprints(
+            stage, {entry[1] for entry in keyed_rows})
+        return [entry for entry in keyed_rows
+                if stored.get(entry[1]) != entry[3]]
+
     def parse_product_name(self, product_title):
         """Extract product name by removing S/N (e.g., 'Regular Fall (#10001)' → 'Regular Fall')."""
-        if not product_title:
-            return False
-        cleaned_name = re.sub(r'\s*\(#\d+\)', '', product_title).strip()
-        return cleaned_name if cleaned_name else False
+        return parse_product_name(product_title)
 
     def process_product_template(self, data, category_cache, attribute_cache,
-                                 value_cache, row_number, total_rows):
-        """Process a single row of CSV data to create or update a product template."""
+                                 value_cache, row_number, ptav_index=None,
+                                 commit=True, ledger=None, schema=None,
+                                 attribute_delta=None):
+        """Process a single row of CSV data to create or update a product template.
+
+        The row runs in a savepoint, a failure only rolls back this row.
+
+        :param commit: commit after the row; pass False to let the caller
+                       commit a whole chunk of rows at once
+        :param ledger: optional :class:`ImportLedger` collecting the timings
+                       and errors of the row instead of logging them
+        :param schema: optional :class:`SheetSchema` decoding the row
+        :param attribute_delta: optional :class:`AttributeDelta` collecting
+                                the attribute values of the row, see
+                                :meth:`update_product_template_attributes`
+        """
         start_time = time.time()
-        product_title = self.parse_product_name(
-            self.clean_value(data.get('Product Title')))
-        default_code = self.clean_value(
-            data.get('S/N')) or f"PROD-{uuid.uuid4().hex[:8]}"
-
-        if not product_title:
-            product_title = 'Empty Product'
+        row = self.prepare_product_row(data, schema)
+        product_title = row['product_title']
+        default_code = row['default_code']
+        category_name = row['category_name']
+        attributes = row['attributes']
 
         _logger.debug(
-            f"Row {row_number}/{total_rows}: Processing product: {product_title} (S/N: {default_code})")
-
-        # Extract fields
-        supplier_name = self.clean_value(data.get('Supplier name'))
-        status = self.clean_value(data.get('Status'))
-        sale_price = self.parse_sale_price(data.get('Sale price')) or 0.0
-        category_name = self.clean_value(data.get('Product Category'))
-        eu_field = self.clean_value(data.get('EU'))
-
-        # Extract attributes
-        attributes = {
-            'Top': self.clean_value(data.get('Top')),
-            'Base Color': self.clean_value(data.get('Base Color')),
-            'HL': self.clean_value(data.get('HL')),
-            'Length': self.clean_value(data.get('Length (inch)')),
-            'Layer': self.clean_value(data.get('Layer')),
-            'Style': self.clean_value(data.get('Style')),
-            'Size': self.clean_value(data.get('Size')),
-        }
-        attributes = {k: v for k, v in attributes.items() if
-                      v}  # Remove False/empty values
-
-        # Search for existing product template using ilike
+            f"Row {row_number}: Processing product: {product_title} (S/N: {default_code})")
 
-        product_template = self.env['product.template'].search(
-            ['|', ('name', '=', product_title),
-             ('name', '=', product_title.lower())],
-            limit=1)
-
-        # Get or create category
-        categ_id = self.get_or_create_category(category_name, category_cache)
-
-        # Prepare product template data
+        # Search for existing product template on its indexed match key
+        with timed(ledger, 'lookup'):
+            product_template = self.find_template_by_title(product_title)
 
+        # Values of this row, handed to the batch delta once its savepoint
+        # is released so a row failing on exit records nothing
+        row_delta = AttributeDelta(self.env) if attribute_delta is not None else None
+        cache_marks = self.mark_lookup_caches(category_cache, attribute_cache,
+                                              value_cache, ptav_index)
         try:
-            action = 'updated' if product_template else 'created'
-            if product_template:
-                template_data = {
-                    'by_pass_variant_creation': True
-                }
-                # Update existing product template
-                product_template.write(template_data)
-                _logger.info(
-                    f"Row {row_number}/{total_rows}: Updated product template - Name: {product_title}, Default Code: {default_code} (ID: {product_template.id})")
-                _logger.debug(
-                    f"Row {row_number}/{total_rows}: Updated product template: {product_title} (ID: {product_template.id}, S/N: {default_code})")
-            else:
-                template_data = {
-                    'name': product_title,
-                    'categ_id': categ_id,
-                    'type': 'consu',
-                    'purchase_ok': True,
-                    'sale_ok': True,
-                    'by_pass_variant_creation': True
-                }
-
-                # Create new product template
-                product_template = self.env['product.template'].create(
-                    template_data)
-                _logger.info(
-                    f"Row {row_number}/{total_rows}: Created product template - Name: {product_title}, Default Code: {default_code} (ID: {product_template.id})")
+            with timed(ledger, 'create'), self.env.cr.savepoint():
+                # Get or create category
+                categ_id = self.get_or_create_category(category_name,
+                                                       category_cache)
+
+                # Prepare product template data
+                action = 'updated' if product_template else 'created'
+                if product_template:
+                    # Only a template without the flag is written, the write
+                    # recomputes the combination of every variant
+                    if not product_template.by_pass_variant_creation:
+                        product_template.write(
+                            {'by_pass_variant_creation': True})
+                    _logger.debug(
+                        f"Row {row_number}: Updated product template: {product_title} (ID: {product_template.id}, S/N: {default_code})")
+                else:
+                    template_data = {
+                        'name': product_title,
+                        'categ_id': categ_id,
+                        'type': 'consu',
+                        'purchase_ok': True,
+                        'sale_ok': True,
+                        'by_pass_variant_creation': True
+                    }
+
+                    # Create new product template
+                    product_template = self.env['product.template'].create(
+                        template_data)
+                    _logger.debug(
+                        f"Row {row_number}: Created product template: {product_title} (ID: {product_template.id}, S/N: {default_code})")
+
+                # Update attributes on product template
+                self.update_product_template_attributes(product_template,
+                                                        attributes,
+                                                        attribute_cache,
+                                                        value_cache,
+                                                        ptav_index,
+                                                        row_delta,
+                                                        row_number)
+            if row_delta is not None:
+                attribute_delta.merge(row_delta)
+
+            if commit:
+                # Commit changes to the database
+                with timed(ledger, 'commit'):
+                    self.env.cr.commit()
                 _logger.debug(
-                    f"Row {row_number}/{total_rows}: Created product template: {product_title} (ID: {product_template.id}, S/N: {default_code})")
-
-            # Update attributes on product template
-            self.update_product_template_attributes(product_template,
-                                                    attributes,
-                                                    attribute_cache,
-                                                    value_cache)
-
-            # Commit changes to the database
-            self.env.cr.commit()
-            _logger.debug(
-                f"Row {row_number}/{total_rows}: Committed changes for product template: {product_template.name} (ID: {product_template.id})")
+                    f"Row {row_number}: Committed changes for product template: {product_template.name} (ID: {product_template.id})")
 
             elapsed_time = time.time() - start_time
             _logger.debug(
-                f"Row {row_number}/{total_rows}: Processed product template {product_title} in {elapsed_time:.2f} seconds")
+                f"Row {row_number}: Processed product template {product_title} in {elapsed_time:.2f} seconds")
 
             return True, action
 
         except Exception as e:
-            _logger.error(
-                f"Row {row_number}/{total_rows}: Error processing product template {product_title} (S/N: {default_code}): {str(e)}")
-            self.env.cr.rollback()  # Rollback on error to avoid partial commits
+            report_row_error(
+                ledger, 'template', row_number, default_code,
+                f"Error processing product template {product_title} (S/N: {default_code}): {str(e)}")
+            # The savepoint rolled back this row only
+            self.reset_lookup_caches(cache_marks, category_cache,
+                                     attribute_cache, value_cache, ptav_index)
             return False, 'failed'
 
+    def prepare_product_row(self, data, schema=None):
+        """Extract product.product values from a CSV row without any ORM lookup.
+
+        :param schema: :class:`SheetSchema` shared by the rows of an import,
+                       built from the row when not given
+        """
+        return (schema or SheetSchema(data)).decode(data)
+
+    def _prepare_product_vals(self, row, product_template, categ_id):
+        """Build the product.product create values of a prepared row."""
+        product_data = {
+            'product_tmpl_id': product_template.id,
+            'default_code': row['default_code'],
+            'name': row['product_title'],
+            'lst_price': row['sale_price'],
+            'categ_id': categ_id,
+            'source': row['source'],
+            'date_order': row['date_ordered'],
+            'arrival_date': row['arrival_date'],
+            'sold_date': row['sold_date'],
+        }
+        if row['status']:
+            product_data['status'] = row['status']
+        return product_data
+
     def process_product(self, data, category_cache, attribute_cache,
-                        value_cache, supplier_cache, row_number, total_rows):
-        """Process a single row of CSV data to create a product.product if it doesn't exist."""
+                        value_cache, supplier_cache, row_number,
+                        ptav_index=None, commit=True, ledger=None,
+                        schema=None):
+        """Process a single row of CSV data to create a product.product if it doesn't exist.
+
+        The row runs in a savepoint, a failure only rolls back this row.
+
+        :param ptav_index: optional :class:`PtavIndex` shared by the rows of
+                           a run to resolve template attribute values
+        :param commit: commit after the row; pass False to let the caller
+                       commit a whole chunk of rows at once
+        :param ledger: optional :class:`ImportLedger` collecting the timings
+                       and errors of the row instead of logging them
+        :param schema: optional :class:`SheetSchema` decoding the row
+        """
         start_time = time.time()
-        product_title = self.parse_product_name(
-            self.clean_value(data.get('Product Title')))
-        default_code = self.clean_value(
-            data.get('S/N')) or f"PROD-{uuid.uuid4().hex[:8]}"
-
-        if not product_title:
-            product_title = 'Empty Product'
+        row = self.prepare_product_row(data, schema)
+        product_title = row['product_title']
+        default_code = row['default_code']
 
         _logger.debug(
-            f"Row {row_number}/{total_rows}: Processing product: {product_title} (S/N: {default_code})")
+            f"Row {row_number}: Processing product: {product_title} (S/N: {default_code})")
 
-        # Check if product.product already exists
-        existing_product = self.env['product.product'].search(
-            [('default_code', '=', default_code)], limit=1)
+        # Check if product.product already exists for this S/N
+        with timed(ledger, 'lookup'):
+            existing_product = self.env['product.product'].browse(
+                self.env['product.product'].find_by_serials(
+                    [default_code]).get(default_code))
         if existing_product:
-            _logger.info(
-                f"Row {row_number}/{total_rows}: Skipped existing product with default_code: {default_code} (ID: {existing_product.id})")
+            _logger.debug(
+                f"Row {row_number}: Skipped existing product with default_code: {default_code} (ID: {existing_product.id})")
             return existing_product, 'skipped'
 
-        # Extract fields
-        supplier_name = self.clean_value(data.get('Supplier name'))
-        status = self.clean_value(
-            data.get('Status')).lower() if self.clean_value(
-            data.get('Status')) else False
-        sale_price = self.parse_sale_price(
-            data.get('Sale price')) or 0.0  # Default to 0.0 if invalid
-        category_name = self.clean_value(data.get('Product Category'))
-        eu_field = self.clean_value(
-            data.get('EU')).lower() if self.clean_value(
-            data.get('EU')) else 'na'
-        date_ordered = self.parse_date(
-            self.clean_value(data.get('Date Ordered')))
-        arrival_date = self.parse_date(
-            self.clean_value(data.get('תאריך הגעה')))
-        sold_date = self.parse_date(self.clean_value(data.get('Sold date')))
-
-        # Map EU to source field
-        source_map = {'eu': 'eu', 'br': 'br', '#n/a': 'na'}
-        source = source_map.get(eu_field, 'na')
-
-        # Extract attributes
-        attributes = {
-            'Top': self.clean_value(data.get('Top')),
-            'Base Color': self.clean_value(data.get('Base Color')),
-            'HL': self.clean_value(data.get('HL')),
-            'Length': self.clean_value(data.get('Length (inch)')),
-            'Layer': self.clean_value(data.get('Layer')),
-            'Style': self.clean_value(data.get('Style')),
-            'Size': self.clean_value(data.get('Size')),
-        }
-        attributes = {k: v for k, v in attributes.items() if
-                      v}  # Remove False/empty values
+        supplier_name = row['supplier_name']
+        attributes = row['attributes']
 
-        # Search for parent product template using ilike
-        product_template = self.env['product.template'].search(
-            ['|', ('name', '=', product_title),
-             ('name', '=', product_title.lower())],
-            limit=1)
+        # Search for parent product template on its indexed match key
+        with timed(ledger, 'lookup'):
+            product_template = self.find_template_by_title(product_title)
         if not product_template:
-            _logger.warning(
-                f"Row {row_number}/{total_rows}: No product template found for {product_title} (S/N: {default_code})")
+            report_row_error(
+                ledger, 'product', row_number, default_code,
+                f"No product template found for {product_title} (S/N: {default_code})")
             return False, 'skipped'
 
-        # Get or create category
-        categ_id = self.get_or_create_category(category_name, category_cache)
+        if ptav_index is None:
+            ptav_index = PtavIndex(self.env)
 
+        cache_marks = self.mark_lookup_caches(category_cache, attribute_cache,
+                                              value_cache, supplier_cache,
+                                              ptav_index)
         try:
-            # Prepare product data
-            product_data = {
-                'product_tmpl_id': product_template.id,
-                'default_code': default_code,
-                'name': product_title,
-                'lst_price': sale_price,
-                'categ_id': categ_id,
-                'source': source,
-                'date_order': date_ordered,
-                'arrival_date': arrival_date,
-                'sold_date': sold_date,
-            }
-
-            # Only include status if it is not '#REF!'
-            if status and status != '#ref!':
-                product_data['status'] = status
-            else:
-                _logger.debug(
-                    f"Row {row_number}/{total_rows}: Skipping status assignment for {product_title} (Status: {status})")
-
-            # Create new product.product
-            product = self.env['product.product'].create(product_data)
-            _logger.info(
-                f"Row {row_number}/{total_rows}: Created product.product - Name: {product_title}, Default Code: {default_code} (ID: {product.id}, Template ID: {product_template.id})")
-            _logger.debug(
-                f"Row {row_number}/{total_rows}: Created product.product: {product_title} (ID: {product.id}, S/N: {default_code})")
-
-            # Assign attributes to product.product
-            attribute_value_ids = []
-            for attr_name, attr_value in attributes.items():
-                attr_id, value_id = self.get_or_create_attribute(attr_name,
-                                                                 attr_value,
-                                                                 attribute_cache,
-                                                                 value_cache)
-                if not attr_id or not value_id:
+            with timed(ledger, 'create'), self.env.cr.savepoint():
+                # Get or create category
+                categ_id = self.get_or_create_category(row['category_name'],
+                                                       category_cache)
+
+                # Prepare product data
+                product_data = self._prepare_product_vals(row, product_template,
+                                                          categ_id)
+                if not row['status']:
                     _logger.debug(
-                        f"Row {row_number}/{total_rows}: Skipping invalid attribute {attr_name} with value {attr_value} for product {product_title}")
-                    continue
-                # Find the corresponding product.template.attribute.value
-                ptav = self.env['product.template.attribute.value'].search([
-                    ('product_tmpl_id', '=', product_template.id),
-                    ('attribute_id', '=', attr_id),
-                    ('product_attribute_value_id', '=', value_id),
-                ], limit=1)
-                if ptav:
-                    attribute_value_ids.append(ptav.id)
-                    _logger.debug(
-                        f"Row {row_number}/{total_rows}: Assigned attribute {attr_name} with value {attr_value} to product {product_title} (Product ID: {product.id}, PTAV ID: {ptav.id})")
-                else:
-                    _logger.warning(
-                        f"Row {row_number}/{total_rows}: Could not find product.template.attribute.value for {attr_name}={attr_value} on template {product_title}")
+                        f"Row {row_number}: Skipping status assignment for {product_title}")
 
-            if attribute_value_ids:
-                product.product_template_attribute_value_ids = [
-                    (6, 0, attribute_value_ids)]
+                # Create new product.product
+                product = self.env['product.product'].create(product_data)
                 _logger.debug(
-                    f"Row {row_number}/{total_rows}: Updated product {product_title} with {len(attribute_value_ids)} attribute values (Product ID: {product.id})")
-
-            # Handle supplier
-            if supplier_name:
-                vendor_id = self.get_or_create_supplier(supplier_name,
-                                                        supplier_cache)
-                if vendor_id:
-                    # Check if supplier info already exists for this product and vendor
-                    existing_supplier_info = self.env[
-                        'product.supplierinfo'].search([
-                        ('partner_id', '=', vendor_id),
-                        ('product_id', '=', product.id),
-                    ], limit=1)
-                    if not existing_supplier_info:
-                        self.env['product.supplierinfo'].create({
-                            'partner_id': vendor_id,
-                            'product_id': product.id,
-                            'product_code': default_code,
-                            'product_name': product_title,
-                            # Added for traceability
-                        })
+                    f"Row {row_number}: Created product.product: {product_title} (ID: {product.id}, S/N: {default_code})")
+
+                # Assign attributes to product.product
+                attribute_value_ids = []
+                for attr_name, attr_value in attributes.items():
+                    attr_id, value_id = self.get_or_create_attribute(attr_name,
+                                                                     attr_value,
+                                                                     attribute_cache,
+                                                                     value_cache)
+                    if not attr_id or not value_id:
                         _logger.debug(
-                            f"Row {row_number}/{total_rows}: Added supplier {supplier_name} for product {product_title} (Product ID: {product.id}, Vendor ID: {vendor_id})")
-                    else:
+                            f"Row {row_number}: Skipping invalid attribute {attr_name} with value {attr_value} for product {product_title}")
+                        continue
+                    # Find the corresponding product.template.attribute.value
+                    ptav_id = ptav_index.get(product_template.id, attr_id,
+                                             value_id)
+                    if ptav_id:
+                        attribute_value_ids.append(ptav_id)
                         _logger.debug(
-                            f"Row {row_number}/{total_rows}: Supplier {supplier_name} already linked to product {product_title} (Product ID: {product.id}, Vendor ID: {vendor_id})")
+                            f"Row {row_number}: Assigned attribute {attr_name} with value {attr_value} to product {product_title} (Product ID: {product.id}, PTAV ID: {ptav_id})")
+                    else:
+                        report_row_error(
+                            ledger, 'product', row_number, default_code,
+                            f"Could not find product.template.attribute.value for {attr_name}={attr_value} on template {product_title}")
 
-            # Commit changes to the database
-            self.env.cr.commit()
-            _logger.debug(
-                f"Row {row_number}/{total_rows}: Committed changes for product: {product_title} (Product ID: {product.id}, Template ID: {product_template.id})")
+                if attribute_value_ids:
+                    product.product_template_attribute_value_ids = [
+                        (6, 0, attribute_value_ids)]
+                    _logger.debug(
+                        f"Row {row_number}: Updated product {product_title} with {len(attribute_value_ids)} attribute values (Product ID: {product.id})")
+
+                # Handle supplier
+                if supplier_name:
+                    vendor_id = self.get_or_create_supplier(supplier_name,
+                                                            supplier_cache)
+                    if vendor_id:
+                        # Check if supplier info already exists for this product and vendor
+                        existing_supplier_info = self.env[
+                            'product.supplierinfo'].search([
+                            ('partner_id', '=', vendor_id),
+                            ('product_id', '=', product.id),
+                        ], limit=1)
+                        if not existing_supplier_info:
+                            self.env['product.supplierinfo'].create({
+                                'partner_id': vendor_id,
+                                'product_id': product.id,
+                                'product_code': default_code,
+                                'product_name': product_title,
+                                # Added for traceability
+                            })
+                            _logger.debug(
+                                f"Row {row_number}: Added supplier {supplier_name} for product {product_title} (Product ID: {product.id}, Vendor ID: {vendor_id})")
+                        else:
+                            _logger.debug(
+                                f"Row {row_number}: Supplier {supplier_name} already linked to product {product_title} (Product ID: {product.id}, Vendor ID: {vendor_id})")
+
+            if commit:
+                # Commit changes to the database
+                with timed(ledger, 'commit'):
+                    self.env.cr.commit()
+                _logger.debug(
+                    f"Row {row_number}: Committed changes for product: {product_title} (Product ID: {product.id}, Template ID: {product_template.id})")
 
             elapsed_time = time.time() - start_time
             _logger.debug(
-                f"Row {row_number}/{total_rows}: Processed product {product_title} in {elapsed_time:.2f} seconds")
+                f"Row {row_number}: Processed product {product_title} in {elapsed_time:.2f} seconds")
 
             return True, 'created'
 
         except Exception as e:
-            _logger.error(
-                f"Row {row_number}/{total_rows}: Error processing product {product_title} (S/N: {default_code}): {str(e)}")
-            self.env.cr.rollback()  # Rollback on error to avoid partial commits
+            report_row_error(
+                ledger, 'product', row_number, default_code,
+                f"Error processing product {product_title} (S/N: {default_code}): {str(e)}")
+            # The savepoint rolled back this row only
+            self.reset_lookup_caches(cache_marks, category_cache,
+                                     attribute_cache, value_cache,
+                                     supplier_cache, ptav_index)
             return False, 'failed'
 
+    def find_template_by_title(self, product_title):
+        """Return the product template matching a product title, case insensitively."""
+        return self.env['product.template'].search(
+            [('import_match_key', '=', name_match_key(product_title))],
+            limit=1)
+
+    def _match_templates_by_title(self, titles):
+        """Resolve product titles to templates with a single query.
+
+        Same match as :meth:`find_template_by_title`: when several templates
+        share a match key, the one coming first in the default template order
+        wins, exactly like ``search(limit=1)``.
+        """
+        keys = {title: name_match_key(title) for title in titles}
+        by_key = {}
+        for template in self.env['product.template'].search(
+                [('import_match_key', 'in', list(set(keys.values())))]):
+            by_key.setdefault(template.import_match_key, template)
+        return {title: by_key[key] for title, key in keys.items()
+                if key in by_key}
+
+    def process_products_bulk(self, batch, category_cache, attribute_cache,
+                              value_cache, supplier_cache, start_row,
+                              ptav_index=None, ledger=None, schema=None):
+        """Process a chunk of CSV rows with set-based lookups and multi-record creates.
+
+        Produces the same product.product and product.supplierinfo records as
+        calling :meth:`process_product` on every row, but resolves the S/Ns,
+        templates, template attribute values and supplier infos of the whole
+        chunk with a handful of ``IN`` queries. The chunk runs in a savepoint
+        and is left for the caller to commit; if anything fails it is rolled
+        back and replayed row by row, so a bad row only fails itself.
+
+        :param start_row: row number of the first row, or the row numbers of
+                          the rows
+        :param ptav_index: optional :class:`PtavIndex` shared by the chunks of
+                           a run to resolve template attribute values
+        :param ledger: optional :class:`ImportLedger` collecting the timings
+                       and errors of the chunk instead of logging them
+        :param schema: optional :class:`SheetSchema` decoding the rows
+        :return: dict with the number of created, skipped and failed rows
+        """
+        start_time = time.time()
+        if ptav_index is None:
+            ptav_index = PtavIndex(self.env)
+        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
+        if not batch:
+            return stats
+        schema = schema or SheetSchema(batch[0])
+        rows = [schema.decode(data) for data in batch]
+        row_numbers = [row_number for row_number, _data in
+                       number_rows(batch, start_row)]
+        errors_before = len(ledger.errors) if ledger is not None else 0
+        cache_marks = self.mark_lookup_caches(category_cache, attribute_cache,
+                                              value_cache, supplier_cache,
+                                              ptav_index)
+        try:
+            with self.env.cr.savepoint():
+                with timed(ledger, 'lookup'):
+                    # Serials already carried by a product, one query for the chunk
+                    existing_codes = set(self.env['product.product'].find_by_serials(
+                        [row['default_code'] for row in rows]))
+                    templates = self._match_templates_by_title(
+                        {row['product_title'] for row in rows})
+
+                    to_create = []
+                    for row_number, row in zip(row_numbers, rows):
+                        default_code = row['default_code']
+                        if default_code in existing_codes:
+                            # Also covers a S/N repeated inside the chunk, which the
+                            # row-by-row path skips once the first row created it.
+                            _logger.debug(
+                                f"Row {row_number}: Skipped existing product with default_code: {default_code}")
+                            stats['skipped'] += 1
+                            continue
+                        product_template = templates.get(row['product_title'])
+                        if not product_template:
+                            report_row_error(
+                                ledger, 'product', row_number, default_code,
+                                f"No product template found for {row['product_title']} (S/N: {default_code})")
+                            stats['skipped'] += 1
+                            continue
+                        existing_codes.add(default_code)
+                        categ_id = self.get_or_create_category(row['category_name'],
+                                                               category_cache)
+                        value_keys = []
+                        for attr_name, attr_value in row['attributes'].items():
+                            attr_id, value_id = self.get_or_create_attribute(
+                                attr_name, attr_value, attribute_cache, value_cache)
+                            if attr_id and value_id:
+                                value_keys.append((attr_id, value_id, attr_name,
+                                                   attr_value))
+                        vendor_id = self.get_or_create_supplier(row['supplier_name'],
+                                                                supplier_cache)
+                        to_create.append((row, product_template, categ_id, value_keys,
+                                          vendor_id, row_number))
+
+                with timed(ledger, 'create'):
+                    if to_create:
+                        Product = self.env['product.product']
+                        # One-unit variants of a template are inserted together
+                        to_create.sort(key=lambda entry: entry[1].id)
+                        # Template attribute values of every template in the chunk
+                        ptav_index.load({entry[1].id for entry in to_create})
+
+                        vals_list = []
+                        for row, product_template, categ_id, value_keys, _vendor_id, row_number in to_create:
+                            product_data = self._prepare_product_vals(
+                                row, product_template, categ_id)
+                            attribute_value_ids = []
+                            for attr_id, value_id, attr_name, attr_value in value_keys:
+                                ptav_id = ptav_index.get(product_template.id,
+                                                         attr_id, value_id)
+                                if ptav_id:
+                                    attribute_value_ids.append(ptav_id)
+                                else:
+                                    report_row_error(
+                                        ledger, 'product', row_number,
+                                        row['default_code'],
+                                        f"Could not find product.template.attribute.value for {attr_name}={attr_value} on template {row['product_title']}")
+                            if attribute_value_ids:
+                                product_data['product_template_attribute_value_ids'] = [
+                                    (6, 0, attribute_value_ids)]
+                            if product_template.by_pass_variant_creation:
+                                product_data['combination_indices'] = Product.get_serial_combination_indices(
+                                    attribute_value_ids, row['default_code'])
+                            vals_list.append(product_data)
+                        products = Product.create(vals_list)
+
+                        # Supplier infos, one lookup and one create for the chunk
+                        vendor_ids = {entry[4] for entry in to_create if entry[4]}
+                        linked = set()
+                        if vendor_ids:
+                            linked = {
+                                (info.partner_id.id, info.product_id.id)
+                                for info in self.env['product.supplierinfo'].search([
+                                    ('partner_id', 'in', list(vendor_ids)),
+                                    ('product_id', 'in', products.ids),
+                                ])}
+                        supplier_vals = []
+                        for product, (row, _tmpl, _categ, _keys, vendor_id, _row_number) in zip(
+                                products, to_create):
+                            if vendor_id and (vendor_id, product.id) not in linked:
+                                supplier_vals.append({
+                                    'partner_id': vendor_id,
+                                    'product_id': product.id,
+                                    'product_code': row['default_code'],
+                                    'product_name': row['product_title'],
+                                })
+                        if supplier_vals:
+                            self.env['product.supplierinfo'].create(supplier_vals)
+                        stats['created'] += len(products)
+        except Exception as e:
+            _logger.error(
+                f"Rows {row_numbers[0]}-{row_numbers[-1]}: Bulk processing failed, replaying chunk row by row: {str(e)}")
+            # The savepoint rolled back the whole chunk, the replay reports its rows again
+            self.reset_lookup_caches(cache_marks, category_cache,
+                                     attribute_cache, value_cache,
+                                     supplier_cache, ptav_index)
+            if ledger is not None:
+                del ledger.errors[errors_before:]
+            stats = {'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
+            for row_number, data in zip(row_numbers, batch):
+                success, action = self.process_product(data, category_cache,
+                                                       attribute_cache,
+                                                       value_cache,
+                                                       supplier_cache,
+                                                       row_number, ptav_index,
+                                                       commit=False,
+                                                       ledger=ledger,
+                                                       schema=schema)
+                stats[action] += 1
+            return stats
+
+        elapsed_time = time.time() - start_time
+        _logger.debug(
+            f"Rows {row_numbers[0]}-{row_numbers[-1]}: Created {stats['created']} products, skipped {stats['skipped']} in {elapsed_time:.2f} seconds")
+        return stats
+
+    def import_template_batch(self, batch, start_row, lookup_cache, stats,
+                              full=False, commit_per_row=False,
+                              ptav_index=None, ledger=None, schema=None):
+        """Create or update the product templates of a batch of CSV rows.
+
+        Unchanged rows are skipped and the fingerprints of the imported rows
+        are stored; committing is left to the caller. The attribute values
+        of the batch are collected per template and applied at the end with
+        one write per attribute line.
+
+        :param lookup_cache: :class:`ImportLookupCache` of the run
+        :param stats: counters of the run, updated in place
+        :param ledger: optional :class:`ImportLedger` of the run
+        :param schema: optional :class:`SheetSchema` of the sheet
+        """
+        changed_rows = self.filter_changed_rows('template', batch, start_row,
+                                                full, schema)
+        stats['unchanged'] += len(batch) - len(changed_rows)
+        imported = {}
+        imported_rows = {}
+        delta = AttributeDelta(self.env)
+        for idx, key, row, fingerprint in changed_rows:
+            success, action = self.process_product_template(
+                row, lookup_cache.categories, lookup_cache.attributes,
+                lookup_cache.values, idx, ptav_index, commit=commit_per_row,
+                ledger=ledger, schema=schema, attribute_delta=delta)
+            if success:
+                stats[action] += 1
+                imported[key] = fingerprint
+                imported_rows[idx] = (key, action)
+            else:
+                stats[action] += 1
+
+        # Attribute values of the whole batch, one write per attribute line
+        with timed(ledger, 'create'):
+            failed_templates = delta.flush(ptav_index)
+        for template_id, (row_numbers, error) in failed_templates.items():
+            for idx in row_numbers:
+                if idx not in imported_rows:
+                    # The row failed on its own and is already counted
+                    continue
+                key, action = imported_rows[idx]
+                report_row_error(
+                    ledger, 'template', idx, key,
+                    f"Error updating attributes of product template {template_id}: {error}")
+                imported.pop(key, None)
+                stats[action] -= 1
+                stats['failed'] += 1
+        self.env['product.import.fingerprint'].store_fingerprints(
+            'template', imported)
+
+    def import_product_batch(self, batch, start_row, lookup_cache, stats,
+                             ptav_index, bulk=False, full=False,
+                             commit_per_row=False, ledger=None, schema=None):
+        """Create the product.product records of a batch of CSV rows.
+
+        Unchanged rows are skipped and the fingerprints of the imported rows
+        are stored; committing is left to the caller.
+
+        :param lookup_cache: :class:`ImportLookupCache` of the run
+        :param stats: counters of the run, updated in place
+        :param ptav_index: :class:`PtavIndex` of the run
+        :param ledger: optional :class:`ImportLedger` of the run
+        :param schema: optional :class:`SheetSchema` of the sheet
+        """
+        changed_rows = self.filter_changed_rows('product', batch, start_row,
+                                                full, schema)
+        stats['unchanged'] += len(batch) - len(changed_rows)
+        imported = {}
+        if bulk and changed_rows:
+            batch_stats = self.process_products_bulk(
+                [entry[2] for entry in changed_rows], lookup_cache.categories,
+                lookup_cache.attributes, lookup_cache.values,
+                lookup_cache.suppliers, [entry[0] for entry in changed_rows],
+                ptav_index,
+                ledger=ledger, schema=schema)
+            for action, count in batch_stats.items():
+                stats[action] += count
+            # Rows are settled once a product carries their S/N
+            fingerprints = {entry[1]: entry[3] for entry in changed_rows}
+            for default_code in self.env['product.product'].find_by_serials(
+                    list(fingerprints)):
+                imported[default_code] = fingerprints[default_code]
+        elif not bulk:
+            for idx, key, row, fingerprint in changed_rows:
+                success, action = self.process_product(
+                    row, lookup_cache.categories, lookup_cache.attributes,
+                    lookup_cache.values, lookup_cache.suppliers, idx,
+                    ptav_index, commit=commit_per_row, ledger=ledger,
+                    schema=schema)
+                if success:
+                    stats[action] += 1
+                    imported[key] = fingerprint
+                else:
+                    stats[action] += 1
+        self.env['product.import.fingerprint'].store_fingerprints(
+            'product', imported)
+
+    @api.model
+    def get_sheet_date_formats(self, file_path):
+        """Read the whole sheet once to detect the date formats of its columns.
+
+        :return: dict {column: formats}, see :meth:`SheetSchema.detected_date_formats`
+        """
+        schema = SheetSchema(())
+        for row in skip_rows(iter_sheet_rows(file_path), SKIP_ROWS):
+            schema.observe_dates(row)
+        return schema.detected_date_formats()
+
+    def _import_batches(self, job, csv_data, batch_size, stats, import_batch,
+                        checkpoint=None, deadline=None):
+        """Run the rows of a sheet through ``import_batch`` one batch at a time.
+
+        Every batch is committed with the checkpoint and the counters of its
+        run, and the import pauses between batches once the next one would
+        run past the deadline.
+
+        :param job: name of the import run
+        :param csv_data: iterable of CSV rows as dicts, the first 5 rows
+                         and the rows done before the checkpoint are skipped
+        :param stats: counters of the run, or counters per stage, updated
+                      from the checkpoint
+        :param import_batch: function(batch, start_row, ledger) importing a
+                             batch without committing
+        :return: tuple (rows done, whether the file was completed)
+        """
+        # Resume after the rows already done by a previous run
+        total_rows = 0
+        if checkpoint:
+            total_rows = checkpoint.row_offset
+            for key, value in (checkpoint.stats or {}).items():
+                if isinstance(stats.get(key), dict):
+                    stats[key].update(value)
+                else:
+                    stats[key] = value
+        batches = iter_batches(skip_rows(csv_data, SKIP_ROWS + total_rows),
+                               batch_size)
+        # Counters, timings and row errors go to the run ledger once per batch
+        run = self.env['product.import.run'].start(job, checkpoint)
+        ledger = ImportLedger(self.env.cr)
+        for batch in batches:
+            batch_start_time = time.time()
+            import_batch(batch, total_rows + 1, ledger)
+            total_rows += len(batch)
+            if checkpoint:
+                checkpoint.save(total_rows, stats)
+            run.record_batch(ledger, total_rows, stats,
+                             time.time() - batch_start_time)
+            with ledger.timed('commit'):
+                self.env.cr.commit()
+            # Keep the ORM cache from growing with the size of the sheet
+            self.env.invalidate_all()
+            batch_elapsed_time = time.time() - batch_start_time
+
+            # Pause before the next chunk would run past the time budget
+            if deadline and time.time() + batch_elapsed_time > deadline:
+                _logger.info(
+                    f"Time budget exhausted after {total_rows} rows, the import continues on the next run")
+                run.finish('paused', ledger)
+                self.env.cr.commit()
+                return total_rows, False
+
+        run.finish('done', ledger)
+        if checkpoint:
+            checkpoint.done()
+        self.env.cr.commit()
+        return total_rows, True
+
     @api.model
-    def import_csv_data(self, csv_data):
-        """Main method to import CSV data and process product templates, skipping first 5 rows."""
+    def import_csv_data(self, csv_data, full=False, batch_size=None,
+                        commit_per_row=False, checkpoint=None, deadline=None,
+                        date_formats=None):
+        """Main method to import CSV data and process product templates, skipping first 5 rows.
+
+        Rows whose fingerprint matches the last successful import are counted
+        as unchanged and not processed. Each row runs in a savepoint and the
+        chunk is committed once all its rows are processed.
+
+        :param csv_data: iterable of CSV rows as dicts, consumed lazily
+        :param full: reprocess every row, ignoring the stored fingerprints
+        :param batch_size: rows per chunk, see :meth:`get_import_batch_size`
+        :param commit_per_row: commit after every row (previous behaviour)
+        :param checkpoint: ``product.import.checkpoint`` to resume from and
+                           save after every chunk
+        :param deadline: time after which the import pauses between chunks
+        :param date_formats: date formats of the whole sheet, see
+                             :meth:`get_sheet_date_formats`; dates are read
+                             day first without them
+        :return: dict with the rows done, the stats and whether the file
+                 was completed (``done``)
+        """
         start_time = time.time()
         _logger.info("Starting CSV data import for product templates")
 
-        # Expected headers
-        expected_headers = {'Product Title', 'S/N', 'Supplier name', 'Status',
-                            'Sale price', 'Product Category', 'EU',
-                            'Top', 'Base Color', 'HL', 'Length (inch)',
-                            'Layer', 'Style', 'Size'}
-
-        # Validate headers
-        if not csv_data or not all(
-                header in csv_data[0] for header in expected_headers):
+        # Validate headers and build the row decoder of the sheet
+        first_row, csv_data = peek_row(csv_data)
+        schema = SheetSchema(first_row or (), date_formats)
+        if not first_row or schema.missing_headers(TEMPLATE_HEADERS):
             _logger.error(
-                f"Invalid CSV headers. Expected: {expected_headers}, Found: {csv_data[0].keys() if csv_data else 'Empty'}")
-            return
-
-        # Skip first 5 rows
-        csv_data = csv_data[5:] if len(csv_data) > 5 else []
-        if not csv_data:
-            _logger.warning("No data to process after skipping first 5 rows")
+                f"Invalid CSV headers. Expected: {set(TEMPLATE_HEADERS)}, Found: {first_row.keys() if first_row else 'Empty'}")
             return
 
-        # Initialize caches and counters
-        category_cache = {}
-        attribute_cache = {}
-        value_cache = {}
-        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
+        # Lookup caches preloaded once and shared between runs, and counters
+        lookup_cache = self.env['product.import.cache'].get_lookup_cache()
+        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0,
+                 'unchanged': 0}
 
-        # Process rows in batches
-        batch_size = 50  # Reduced batch size for more frequent commits
-        total_rows = len(csv_data)
+        # Process rows in batches, skipping the first 5 rows
+        batch_size = batch_size or self.get_import_batch_size(commit_per_row)
         _logger.info(
-            f"Processing {total_rows} rows in batches of {batch_size}")
-
-        for i in range(0, total_rows, batch_size):
-            batch_start_time = time.time()
-            batch = csv_data[i:i + batch_size]
-            _logger.info(
-                f"Processing batch {i // batch_size + 1} ({len(batch)} rows)")
-            for idx, row in enumerate(batch, start=i + 1):
-                success, action = self.process_product_template(row,
-                                                                category_cache,
-                                                                attribute_cache,
-                                                                value_cache,
-                                                                idx,
-                                                                total_rows)
-                if success:
-                    stats[action] += 1
-                else:
-                    stats[action] += 1
-            batch_elapsed_time = time.time() - batch_start_time
-            _logger.info(
-                f"Completed batch {i // batch_size + 1} in {batch_elapsed_time:.2f} seconds")
+            f"Processing rows in batches of {batch_size}, committing every {'row' if commit_per_row else 'batch'}")
+
+        def import_batch(batch, start_row, ledger):
+            self.import_template_batch(batch, start_row, lookup_cache, stats,
+                                       full=full, commit_per_row=commit_per_row,
+                                       ledger=ledger, schema=schema)
+
+        total_rows, done = self._import_batches(
+            'product_templates', csv_data, batch_size, stats, import_batch,
+            checkpoint=checkpoint, deadline=deadline)
+        if not done:
+            return {'rows': total_rows, 'stats': stats, 'done': False}
+        if not total_rows:
+            _logger.warning("No data to process after skipping first 5 rows")
+            return {'rows': 0, 'stats': stats, 'done': True}
 
         total_elapsed_time = time.time() - start_time
         _logger.info(
-            f"Completed CSV data import for product templates in {total_elapsed_time:.2f} seconds")
+            f"Completed CSV data import for product templates ({total_rows} rows) in {total_elapsed_time:.2f} seconds ({total_rows / (total_elapsed_time or 1):.1f} rows/s)")
         _logger.info(
-            f"Import summary: Created={stats['created']}, Updated={stats['updated']}, Skipped={stats['skipped']}, Failed={stats['failed']}")
+            f"Import summary: Created={stats['created']}, Updated={stats['updated']}, Skipped={stats['skipped']}, Failed={stats['failed']}, Unchanged={stats['unchanged']}")
+        return {'rows': total_rows, 'stats': stats, 'done': True}
 
     @api.model
-    def cron_import_product_templates(self):
+    def cron_import_product_templates(self, full=False):
         """Cron job to process CSV data from a static file path for product templates."""
         start_time = time.time()
         _logger.info("Starting cron job to import product template CSV data")
 
-        # Static CSV file path
-        file_path = tools.misc.file_path(
-            "bizzup_import_product/Product Data - Sheet.csv")
+        # CSV or XLSX product sheet
+        file_path = self.get_sheet_path()
 
         # Check if file exists
         if not os.path.exists(file_path):
@@ -571,19 +1046,13 @@ class ProductTemplate(models.Model):
             return
 
         try:
-            # Read and parse CSV file with UTF-8 encoding, handling BOM if present
+            # Stream the CSV file with UTF-8 encoding, handling BOM if present
             _logger.debug(f"Reading CSV file: {file_path}")
-            with open(file_path, 'r', encoding='utf-8-sig') as csv_file:
-                reader = csv.DictReader(csv_file)
-                csv_data = [row for row in reader]
-
-            if not csv_data:
-                _logger.warning("CSV file is empty")
-                return
-
-            _logger.info(f"Read {len(csv_data)} rows from CSV file")
-            # Import CSV data
-            self.import_csv_data(csv_data)
+            self.env['product.import.checkpoint'].run_job(
+                'product_templates', file_path,
+                'bizzup_import_product.cron_import_product_templates',
+                self.import_csv_data, iter_sheet_rows(file_path), full=full,
+                date_formats=self.get_sheet_date_formats(file_path))
             elapsed_time = time.time() - start_time
             _logger.info(
                 f"Cron job for product templates completed successfully in {elapsed_time:.2f} seconds")
@@ -596,82 +1065,87 @@ class ProductTemplate(models.Model):
             raise
 
     @api.model
-    def import_products_csv_data(self, csv_data):
-        """Main method to import CSV data and create product.product records, skipping first 5 rows."""
+    def import_products_csv_data(self, csv_data, bulk=False, full=False,
+                                 batch_size=None, commit_per_row=False,
+                                 checkpoint=None, deadline=None,
+                                 date_formats=None):
+        """Main method to import CSV data and create product.product records, skipping first 5 rows.
+
+        Rows whose fingerprint matches the last successful import are counted
+        as unchanged and not processed. Each row (or bulk chunk) runs in a
+        savepoint and the chunk is committed once all its rows are processed.
+
+        :param csv_data: iterable of CSV rows as dicts, consumed lazily
+        :param bulk: process each batch with :meth:`process_products_bulk`
+                     instead of one row at a time
+        :param full: reprocess every row, ignoring the stored fingerprints
+        :param batch_size: rows per chunk, see :meth:`get_import_batch_size`
+        :param commit_per_row: commit after every row (previous behaviour),
+                               ignored in bulk mode
+        :param checkpoint: ``product.import.checkpoint`` to resume from and
+                           save after every chunk
+        :param deadline: time after which the import pauses between chunks
+        :param date_formats: date formats of the whole sheet, see
+                             :meth:`get_sheet_date_formats`; dates are read
+                             day first without them
+        :return: dict with the rows done, the stats and whether the file
+                 was completed (``done``)
+        """
         start_time = time.time()
         _logger.info("Starting CSV data import for products")
 
-        # Expected headers
-        expected_headers = {'Product Title', 'S/N', 'Supplier name', 'Status',
-                            'Sale price', 'Product Category', 'EU',
-                            'Top', 'Base Color', 'HL', 'Length (inch)',
-                            'Layer', 'Style', 'Size', 'Date Ordered',
-                            'תאריך הגעה', 'Sold date'}
-
-        # Validate headers
-        if not csv_data or not all(
-                header in csv_data[0] for header in expected_headers):
+        # Validate headers and build the row decoder of the sheet
+        first_row, csv_data = peek_row(csv_data)
+        schema = SheetSchema(first_row or (), date_formats)
+        if not first_row or schema.missing_headers(PRODUCT_HEADERS):
             _logger.error(
-                f"Invalid CSV headers. Expected: {expected_headers}, Found: {csv_data[0].keys() if csv_data else 'Empty'}")
+                f"Invalid CSV headers. Expected: {set(PRODUCT_HEADERS)}, Found: {first_row.keys() if first_row else 'Empty'}")
             return
 
-        # Skip first 5 rows
-        csv_data = csv_data[5:] if len(csv_data) > 5 else []
-        if not csv_data:
-            _logger.warning("No data to process after skipping first 5 rows")
-            return
+        # Lookup caches preloaded once and shared between runs, and counters
+        lookup_cache = self.env['product.import.cache'].get_lookup_cache()
+        ptav_index = PtavIndex(self.env)
+        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0,
+                 'unchanged': 0}
 
-        # Initialize caches and counters
-        category_cache = {}
-        attribute_cache = {}
-        value_cache = {}
-        supplier_cache = {}
-        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
-
-        # Process rows in batches
-        batch_size = 50  # Reduced batch size for more frequent commits
-        total_rows = len(csv_data)
+        # Process rows in batches, skipping the first 5 rows
+        commit_per_row = commit_per_row and not bulk
+        batch_size = batch_size or self.get_import_batch_size(commit_per_row)
         _logger.info(
-            f"Processing {total_rows} rows in batches of {batch_size}")
-
-        for i in range(0, total_rows, batch_size):
-            batch_start_time = time.time()
-            batch = csv_data[i:i + batch_size]
-            _logger.info(
-                f"Processing batch {i // batch_size + 1} ({len(batch)} rows)")
-            for idx, row in enumerate(batch, start=i + 1):
-                success, action = self.process_product(row, category_cache,
-                                                       attribute_cache,
-                                                       value_cache,
-                                                       supplier_cache, idx,
-                                                       total_rows)
-                if success:
-                    stats[action] += 1
-                else:
-                    stats[action] += 1
-            batch_elapsed_time = time.time() - batch_start_time
-            _logger.info(
-                f"Completed batch {i // batch_size + 1} in {batch_elapsed_time:.2f} seconds")
+            f"Processing rows in batches of {batch_size}, committing every {'row' if commit_per_row else 'batch'}")
+
+        def import_batch(batch, start_row, ledger):
+            self.import_product_batch(batch, start_row, lookup_cache, stats,
+                                      ptav_index, bulk=bulk, full=full,
+                                      commit_per_row=commit_per_row,
+                                      ledger=ledger, schema=schema)
+
+        total_rows, done = self._import_batches(
+            'products', csv_data, batch_size, stats, import_batch,
+            checkpoint=checkpoint, deadline=deadline)
+        if not done:
+            return {'rows': total_rows, 'stats': stats, 'done': False}
+        if not total_rows:
+            _logger.warning("No data to process after skipping first 5 rows")
+            return {'rows': 0, 'stats': stats, 'done': True}
 
         total_elapsed_time = time.time() - start_time
         _logger.info(
-            f"Completed CSV data import for products in {total_elapsed_time:.2f} seconds")
+            f"Completed CSV data import for products ({total_rows} rows) in {total_elapsed_time:.2f} seconds ({total_rows / (total_elapsed_time or 1):.1f} rows/s)")
         _logger.info(
-            f"Import summary: Created={stats['created']}, Updated={stats['updated']}, Skipped={stats['skipped']}, Failed={stats['failed']}")
+            f"Import summary: Created={stats['created']}, Updated={stats['updated']}, Skipped={stats['skipped']}, Failed={stats['failed']}, Unchanged={stats['unchanged']}")
+        return {'rows': total_rows, 'stats': stats, 'done': True}
 
     @api.model
-    def cron_create_products(self):
+    def cron_create_products(self, bulk=False, full=False):
         """Cron job to process CSV data from a static file path for product.product creation."""
-        self.env.cr.execute(
-            "DROP INDEX IF EXISTS product_product_combination_unique;")
 
         start_time = time.time()
         _logger.info(
             "Starting cron job to create product.product from CSV data")
 
-        # Static CSV file path
-        file_path = tools.misc.file_path(
-            "bizzup_import_product/Product Data - Sheet.csv")
+        # CSV or XLSX product sheet
+        file_path = self.get_sheet_path()
 
         # Check if file exists
         if not os.path.exists(file_path):
@@ -684,19 +1158,14 @@ class ProductTemplate(models.Model):
             return
 
         try:
-            # Read and parse CSV file with UTF-8 encoding, handling BOM if present
+            # Stream the CSV file with UTF-8 encoding, handling BOM if present
             _logger.debug(f"Reading CSV file: {file_path}")
-            with open(file_path, 'r', encoding='utf-8-sig') as csv_file:
-                reader = csv.DictReader(csv_file)
-                csv_data = [row for row in reader]
-
-            if not csv_data:
-                _logger.warning("CSV file is empty")
-                return
-
-            _logger.info(f"Read {len(csv_data)} rows from CSV file")
-            # Import CSV data for products
-            self.import_products_csv_data(csv_data)
+            self.env['product.import.checkpoint'].run_job(
+                'products', file_path,
+                'bizzup_import_product.cron_create_products',
+                self.import_products_csv_data, iter_sheet_rows(file_path),
+                bulk=bulk, full=full,
+                date_formats=self.get_sheet_date_formats(file_path))
             elapsed_time = time.time() - start_time
             _logger.info(
                 f"Cron job for product.product creation completed successfully in {elapsed_time:.2f} seconds")
@@ -708,3 +1177,125 @@ class ProductTemplate(models.Model):
             _logger.info(
                 f"Cron job for product.product creation terminated after {elapsed_time:.2f} seconds")
             raise
+
+    def import_sheet_batch(self, batch, start_row, lookup_cache, stats,
+                           timings, ptav_index, full=False, ledger=None,
+                           schema=None):
+        """Run a batch of CSV rows through the template, product and lot stages.
+
+        Committing is left to the caller.
+
+        :param start_row: row number of the first row, or the row numbers of
+                          the rows
+        :param stats: counters per stage, updated in place
+        :param timings: seconds spent per stage, updated in place
+        :param ptav_index: :class:`PtavIndex` of the run
+        """
+        stage_start = time.time()
+        self.import_template_batch(batch, start_row, lookup_cache,
+                                   stats['template'], full=full,
+                                   ptav_index=ptav_index, ledger=ledger,
+                                   schema=schema)
+        timings['template'] += time.time() - stage_start
+
+        stage_start = time.time()
+        self.import_product_batch(batch, start_row, lookup_cache,
+                                  stats['product'], ptav_index, bulk=True,
+                                  full=full, ledger=ledger, schema=schema)
+        timings['product'] += time.time() - stage_start
+
+        stage_start = time.time()
+        self.env['stock.lot'].create_lots_from_rows(
+            batch, stats['lot'], bulk=True, start_row=start_row,
+            ledger=ledger, schema=schema)
+        timings['lot'] += time.time() - stage_start
+
+    @api.model
+    def import_product_sheet(self, csv_data, full=False, batch_size=None,
+                             checkpoint=None, deadline=None,
+                             date_formats=None):
+        """Import templates, products and lots from a single read of the sheet.
+
+        Each chunk of rows goes through the template, product (bulk) and lot
+        stages in turn before it is committed, so the three stages share the
+        lookup caches, the PTAV index and one pass over the file. The time
+        spent in every stage is logged at the end of the run.
+
+        :param csv_data: iterable of CSV rows as dicts, consumed lazily
+        :param full: reprocess every row, ignoring the stored fingerprints
+        :param batch_size: rows per chunk, see :meth:`get_import_batch_size`
+        :param checkpoint: ``product.import.checkpoint`` to resume from and
+                           save after every chunk
+        :param deadline: time after which the import pauses between chunks
+        :param date_formats: date formats of the whole sheet, see
+                             :meth:`get_sheet_date_formats`; dates are read
+                             day first without them
+        """
+        start_time = time.time()
+        _logger.info("Starting single pass import of the product sheet")
+
+        # Validate headers once for all the stages and build the row decoder
+        first_row, csv_data = peek_row(csv_data)
+        schema = SheetSchema(first_row or (), date_formats)
+        if not first_row or schema.missing_headers(PRODUCT_HEADERS):
+            _logger.error(
+                f"Invalid CSV headers. Expected: {set(PRODUCT_HEADERS)}, Found: {first_row.keys() if first_row else 'Empty'}")
+            return
+
+        # Lookup caches and PTAV index shared by all the stages
+        lookup_cache = self.env['product.import.cache'].get_lookup_cache()
+        ptav_index = PtavIndex(self.env)
+        stages = ('template', 'product', 'lot')
+        stats = {stage: {'created': 0, 'updated': 0, 'skipped': 0,
+                         'failed': 0, 'unchanged': 0} for stage in stages}
+        timings = dict.fromkeys(stages, 0.0)
+
+        batch_size = batch_size or self.get_import_batch_size()
+        _logger.info(f"Processing rows in batches of {batch_size}")
+
+        def import_batch(batch, start_row, ledger):
+            self.import_sheet_batch(batch, start_row, lookup_cache, stats,
+                                    timings, ptav_index, full=full,
+                                    ledger=ledger, schema=schema)
+
+        total_rows, done = self._import_batches(
+            'product_sheet', csv_data, batch_size, stats, import_batch,
+            checkpoint=checkpoint, deadline=deadline)
+        if not done:
+            return {'rows': total_rows, 'stats': stats, 'timings': timings,
+                    'done': False}
+        if not total_rows:
+            _logger.warning("No data to process after skipping first 5 rows")
+            return {'rows': 0, 'stats': stats, 'timings': timings,
+                    'done': True}
+
+        total_elapsed_time = time.time() - start_time
+        _logger.info(
+            f"Completed single pass import of the product sheet ({total_rows} rows) in {total_elapsed_time:.2f} seconds ({total_rows / (total_elapsed_time or 1):.1f} rows/s)")
+        for stage in stages:
+            stage_stats = stats[stage]
+            _logger.info(
+                f"Stage {stage}: {timings[stage]:.2f} seconds, Created={stage_stats['created']}, Updated={stage_stats['updated']}, Skipped={stage_stats['skipped']}, Failed={stage_stats['failed']}, Unchanged={stage_stats['unchanged']}")
+        return {'rows': total_rows, 'stats': stats, 'timings': timings,
+                'done': True}
+
+    @api.model
+    def cron_import_product_sheet(self, full=False):
+        """Cron job importing templates, products and lots in a single pass."""
+
+        # CSV or XLSX product sheet
+        file_path = self.get_sheet_path()
+
+        # Check if file exists and is readable
+        if not os.path.exists(file_path):
+            _logger.error(f"CSV file not found at: {file_path}")
+            return
+        if not os.access(file_path, os.R_OK):
+            _logger.error(f"No read permissions for CSV file: {file_path}")
+            return
+
+        self.env['product.import.checkpoint'].run_job(
+            'product_sheet', file_path,
+            'bizzup_import_product.cron_import_product_sheet',
+            self.import_product_sheet, iter_sheet_rows(file_path), full=full,
+            date_formats=self.get_sheet_date_formats(file_path))
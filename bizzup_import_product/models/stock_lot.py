@@ -5,102 +5,281 @@
 # Proprietary and confidential for more information, please contact
 # lg@bizzup.app
 
-from odoo import models,tools
-import csv
+from odoo import models
 import os
 import logging
-from io import StringIO
+import time
+
+from ..utils.csv_stream import (SKIP_ROWS, iter_batches, iter_sheet_rows,
+                                number_rows, peek_row, skip_rows)
+from ..utils.import_ledger import ImportLedger, report_row_error, timed
+from ..utils.sheet_schema import LOT_HEADERS, SheetSchema
 
 _logger = logging.getLogger(__name__)
 
 class StockLot(models.Model):
     _inherit = 'stock.lot'
 
-    def create_lot_from_csv(self, file_path):
-        """Create stock.lot records from CSV file based on S/N, skipping first 5 rows."""
-        Product = self.env['product.product']
-        Lot = self.env['stock.lot']
-
-        # Check if file exists
-        if not os.path.exists(file_path):
-            _logger.error(f"CSV file not found at: {file_path}")
-            return
-
-        # Read CSV data
-        try:
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                csv_content = f.read()
-        except Exception as e:
-            _logger.error(f"Error reading CSV file {file_path}: {str(e)}")
-            return
-
-        # Parse CSV data
-        csv_file = StringIO(csv_content)
-        reader = csv.reader(csv_file)
+    def create_lots_from_rows(self, rows, stats=None, bulk=False, start_row=1,
+                              ledger=None, schema=None):
+        """Create the stock.lot records of a batch of CSV rows based on S/N.
 
-        # Skip first 5 rows
-        for _ in range(5):
-            try:
-                next(reader, None)
-            except StopIteration:
-                _logger.error("CSV has fewer than 5 rows.")
-                return
+        Committing is left to the caller.
 
-        # Assume headers for DictReader
-        headers = ['S/N', 'Supplier name', 'Top', 'Base Color', 'HL', 'Length (inch)', 'Layer', 'Style', 'Size', 'EU', 'Status', 'Date Ordered', 'תאריך הגעה', 'Sold date', 'sales order customer name', 'Sale price', 'Product Title', 'Product Category']
-        try:
-            dict_reader = csv.DictReader(csv_file, fieldnames=headers)
-            next(dict_reader, None)  # Skip the header row
-        except StopIteration:
-            _logger.error("CSV has no data rows after skipping 5 rows.")
-            return
+        :param stats: optional counters (created/skipped/failed), updated in place
+        :param bulk: resolve and create the whole batch at once, see
+                     :meth:`create_lots_bulk`
+        :param start_row: row number of the first row, or the row numbers of
+                          the rows, for error reporting
+        :param ledger: optional :class:`ImportLedger` collecting the timings
+                       and errors of the rows instead of logging them
+        :param schema: optional :class:`SheetSchema` decoding the rows
+        """
+        stats = stats if stats is not None else {}
+        for action in ('created', 'skipped', 'failed'):
+            stats.setdefault(action, 0)
+        numbered_rows = number_rows(rows, start_row)
+        schema = schema or SheetSchema(rows[0] if rows else ())
+        if bulk:
+            return self.create_lots_bulk(numbered_rows, stats, ledger, schema)
+        return self._create_lots_row_by_row(numbered_rows, stats, ledger,
+                                            schema)
 
-        for row in dict_reader:
-            serial_number = row.get('S/N', '').strip()
+    def _create_lots_row_by_row(self, numbered_rows, stats, ledger, schema):
+        Product = self.env['product.product']
+        Lot = self.env['stock.lot']
+        for row_number, row in numbered_rows:
+            serial_number = schema.serial_number(row)
 
             # Skip rows with missing S/N
             if not serial_number:
-                _logger.warning("Skipping row with missing S/N.")
+                _logger.debug(f"Row {row_number}: Skipping row with missing S/N.")
+                stats['skipped'] += 1
                 continue
 
-            # Search for existing product by S/N
-            product = Product.search([
-                ('default_code', '=', serial_number)
-            ], limit=1)
+            # Product carrying the S/N and its lot for that product
+            with timed(ledger, 'lookup'):
+                product = Product.browse(Product.find_by_serials(
+                    [serial_number]).get(serial_number))
+                existing_lot = Lot.browse(self._find_serial_lots(
+                    {serial_number: product.id}).get(serial_number))
 
             if not product:
-                _logger.warning(f"No existing product found for S/N {serial_number}. Skipping.")
+                report_row_error(ledger, 'lot', row_number, serial_number,
+                                 f"No existing product found for S/N {serial_number}. Skipping.")
+                stats['skipped'] += 1
                 continue
 
-            # Check if stock.lot already exists with same name and product_id
-            existing_lot = Lot.search([
-                ('name', '=', serial_number),
-                ('product_id', '=', product.id)
-            ], limit=1)
-
             if existing_lot:
-                _logger.info(f"Stock lot already exists: {existing_lot.name} (ID: {existing_lot.id}) for product: {product.name} (ID: {product.id}). Skipping.")
+                _logger.debug(f"Stock lot already exists: {existing_lot.name} (ID: {existing_lot.id}) for product: {product.name} (ID: {product.id}). Skipping.")
+                stats['skipped'] += 1
                 continue
 
-            # Create stock.lot
+            # Create stock.lot, a failure only rolls back this row
             try:
-                lot = Lot.create({
+                with timed(ledger, 'create'), self.env.cr.savepoint():
+                    lot = Lot.create({
+                        'name': serial_number,
+                        'product_id': product.id,
+                    })
+                stats['created'] += 1
+                _logger.debug(f"Created lot: {lot.name} (ID: {lot.id}) for product: {product.name} (ID: {product.id})")
+            except Exception as e:
+                stats['failed'] += 1
+                report_row_error(ledger, 'lot', row_number, serial_number,
+                                 f"Error creating stock lot for S/N {serial_number} and product {product.name}: {str(e)}")
+                continue
+        return stats
+
+    def create_lots_bulk(self, numbered_rows, stats, ledger=None, schema=None):
+        """Create the missing stock.lot records of a batch of CSV rows at once.
+
+        S/Ns are resolved to products with one query on the indexed
+        internal reference, their lots with one query on the serial
+        registry (and one on ``stock.lot`` for the serials registered for
+        another product), and the missing lots are created with a single
+        multi-record ``create``, which registers them.
+        Skipped rows are reported as a summary; if the create fails, the
+        batch is replayed row by row so only the failing rows are lost.
+
+        :param numbered_rows: list of (row number, CSV row)
+        :param stats: counters (created/skipped/failed), updated in place
+        :param ledger: optional :class:`ImportLedger` of the run
+        :param schema: optional :class:`SheetSchema` decoding the rows
+        """
+        Lot = self.env['stock.lot']
+        schema = schema or SheetSchema(
+            numbered_rows[0][1] if numbered_rows else ())
+        skipped = {'missing S/N': 0, 'no product': 0, 'existing lot': 0,
+                   'duplicate S/N': 0}
+        rows_by_serial = {}
+        for row_number, row in numbered_rows:
+            serial_number = schema.serial_number(row)
+            if not serial_number:
+                skipped['missing S/N'] += 1
+            elif serial_number in rows_by_serial:
+                skipped['duplicate S/N'] += 1
+            else:
+                rows_by_serial[serial_number] = (row_number, row)
+        serial_numbers = list(rows_by_serial)
+
+        # Products and lots of every S/N of the batch, one query each
+        with timed(ledger, 'lookup'):
+            products = self.env['product.product'].find_by_serials(
+                serial_numbers)
+            lots = self._find_serial_lots(products)
+
+        vals_list = []
+        for serial_number in serial_numbers:
+            product_id = products.get(serial_number)
+            lot_id = lots.get(serial_number)
+            if not product_id:
+                skipped['no product'] += 1
+                report_row_error(ledger, 'lot', rows_by_serial[serial_number][0],
+                                 serial_number,
+                                 f"No existing product found for S/N {serial_number}. Skipping.")
+            elif lot_id:
+                skipped['existing lot'] += 1
+            else:
+                vals_list.append({
                     'name': serial_number,
-                    'product_id': product.id,
+                    'product_id': product_id,
                 })
-                _logger.info(f"Created lot: {lot.name} (ID: {lot.id}) for product: {product.name} (ID: {product.id})")
+        stats['skipped'] += sum(skipped.values())
+
+        if vals_list:
+            try:
+                with timed(ledger, 'create'), self.env.cr.savepoint():
+                    Lot.create(vals_list)
+                stats['created'] += len(vals_list)
             except Exception as e:
-                _logger.error(f"Error creating stock lot for S/N {serial_number} and product {product.name}: {str(e)}")
-                continue
+                _logger.warning(
+                    f"Bulk creation of {len(vals_list)} stock lots failed, retrying row by row: {str(e)}")
+                self._create_lots_row_by_row(
+                    [rows_by_serial[vals['name']] for vals in vals_list],
+                    stats, ledger, schema)
+
+        _logger.debug(
+            f"Stock lots: Skipped {', '.join(f'{reason}={count}' for reason, count in skipped.items() if count) or 0}")
+        return stats
+
+    def _find_serial_lots(self, products):
+        """Return the existing lots of (serial, product) pairs.
 
-        # Commit changes
+        The serial registry holds one lot per serial; the pairs whose serial
+        is registered for another product's lot are looked up on
+        ``stock.lot`` with one more query, lots being unique per serial and
+        product.
+
+        :param products: dict {serial: product id}
+        :return: dict {serial: lot id}, only for the pairs that have a lot
+        """
+        products = {serial: product_id for serial, product_id in products.items()
+                    if serial and product_id}
+        if not products:
+            return {}
+        lots = {}
+        for serial_number, (product_id, lot_id) in self.env[
+                'stock.serial.registry'].resolve(list(products)).items():
+            if lot_id and product_id == products[serial_number]:
+                lots[serial_number] = lot_id
+        missing = {serial: product_id for serial, product_id in products.items()
+                   if serial not in lots}
+        if missing:
+            for lot in self.env['stock.lot'].search_read(
+                    [('name', 'in', list(missing)),
+                     ('product_id', 'in', list(set(missing.values())))],
+                    ['name', 'product_id'], order='id'):
+                if missing.get(lot['name']) == lot['product_id'][0]:
+                    lots.setdefault(lot['name'], lot['id'])
+        return lots
+
+    def create_lot_from_csv(self, file_path, batch_size=500, bulk=False,
+                            checkpoint=None, deadline=None):
+        """Create stock.lot records from CSV file based on S/N, skipping first 5 rows.
+
+        Rows are streamed from the file and committed every ``batch_size`` rows.
+
+        :param bulk: create the lots of each batch with :meth:`create_lots_bulk`
+        :param checkpoint: ``product.import.checkpoint`` to resume from and
+                           save after every batch
+        :param deadline: time after which the import pauses between batches
+        """
+        # Check if file exists
+        if not os.path.exists(file_path):
+            _logger.error(f"CSV file not found at: {file_path}")
+            return
+
+        # Read CSV header
+        try:
+            first_row, rows = peek_row(iter_sheet_rows(file_path))
+        except Exception as e:
+            _logger.error(f"Error reading CSV file {file_path}: {str(e)}")
+            return
+
+        schema = SheetSchema(first_row or ())
+        if not first_row or schema.missing_headers(LOT_HEADERS):
+            _logger.error(
+                f"Invalid CSV headers. Expected: S/N, Found: {first_row.keys() if first_row else 'Empty'}")
+            return
+
+        # Skip first 5 rows and the rows done by a previous run
+        stats = {'created': 0, 'skipped': 0, 'failed': 0}
+        row_offset = 0
+        if checkpoint:
+            row_offset = checkpoint.row_offset
+            stats.update(checkpoint.stats or {})
+        batches = iter_batches(skip_rows(rows, SKIP_ROWS + row_offset),
+                               batch_size)
+        has_rows = bool(row_offset)
+        # Counters, timings and row errors go to the run ledger once per batch
+        run = self.env['product.import.run'].start('stock_lots', checkpoint)
+        ledger = ImportLedger(self.env.cr)
+        for batch in batches:
+            batch_start_time = time.time()
+            has_rows = True
+            self.create_lots_from_rows(batch, stats, bulk=bulk,
+                                       start_row=row_offset + 1, ledger=ledger,
+                                       schema=schema)
+            row_offset += len(batch)
+            if checkpoint:
+                checkpoint.save(row_offset, stats)
+            run.record_batch(ledger, row_offset, stats,
+                             time.time() - batch_start_time)
+
+            # Commit changes and keep the ORM cache from growing with the file
+            with ledger.timed('commit'):
+                self.env.cr.commit()
+            self.env.invalidate_all()
+
+            # Pause before the next batch would run past the time budget
+            batch_elapsed_time = time.time() - batch_start_time
+            if deadline and time.time() + batch_elapsed_time > deadline:
+                _logger.info(
+                    f"Time budget exhausted after {row_offset} rows, the lot import continues on the next run")
+                run.finish('paused', ledger)
+                self.env.cr.commit()
+                return {'rows': row_offset, 'stats': stats, 'done': False}
+
+        run.finish('done', ledger)
+        if checkpoint:
+            checkpoint.done()
         self.env.cr.commit()
+        if not has_rows:
+            _logger.error("CSV has no data rows after skipping 5 rows.")
+            return {'rows': 0, 'stats': stats, 'done': True}
+        _logger.info(
+            f"Stock lot import summary: Created={stats['created']}, Skipped={stats['skipped']}, Failed={stats['failed']}")
+        return {'rows': row_offset, 'stats': stats, 'done': True}
 
-    def cron_create_lot_from_csv(self):
+    def cron_create_lot_from_csv(self, bulk=False):
         """Cron job to process CSV file."""
-        file_path = tools.misc.file_path("bizzup_import_product/Product Data - Sheet.csv")
+        file_path = self.env['product.template'].get_sheet_path()
         if os.path.exists(file_path):
             _logger.info(f"Processing CSV file: {file_path}")
-            self.create_lot_from_csv(file_path=file_path)
+            self.env['product.import.checkpoint'].run_job(
+                'stock_lots', file_path,
+                'bizzup_import_product.cron_cron_create_lot',
+                self.create_lot_from_csv, file_path, bulk=bulk)
         else:
             _logger.error(f"CSV file not found at: {file_path}")
\ No newline at end of file
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+from collections import defaultdict
+
+_logger = logging.getLogger(__name__)
+
+
+class AttributeDelta:
+    """Attribute values to add to product templates, applied per attribute line.
+
+    The template import records the (attribute, value) pairs of its rows and
+    applies them once per batch: one search for the attribute lines of the
+    templates, one write per line that gains values and one create for the
+    missing lines, instead of a write per row and value.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        # template id -> attribute id -> value ids
+        self._values = defaultdict(lambda: defaultdict(set))
+        # template id -> row numbers that added values
+        self._rows = defaultdict(set)
+
+    def __bool__(self):
+        return bool(self._values)
+
+    def add(self, template_id, additions, row_number=None):
+        """Record the (attribute id, value id) pairs a row adds to a template."""
+        for attr_id, value_id in additions:
+            self._values[template_id][attr_id].add(value_id)
+        if additions and row_number is not None:
+            self._rows[template_id].add(row_number)
+
+    def merge(self, other):
+        """Record the values and rows of another delta, e.g. of a row that succeeded."""
+        for template_id, template_values in other._values.items():
+            for attr_id, value_ids in template_values.items():
+                self._values[template_id][attr_id] |= value_ids
+        for template_id, row_numbers in other._rows.items():
+            self._rows[template_id] |= row_numbers
+
+    def flush(self, ptav_index=None):
+        """Apply the recorded values and forget them.
+
+        Templates are applied together; if that fails, every template is
+        retried in its own savepoint so a bad template only fails itself.
+
+        :param ptav_index: optional :class:`PtavIndex` refreshed for the
+                           templates whose lines changed
+        :return: dict of template id -> (row numbers, error) of the templates
+                 that could not be updated
+        """
+        values, self._values = self._values, defaultdict(lambda: defaultdict(set))
+        rows, self._rows = self._rows, defaultdict(set)
+        if not values:
+            return {}
+        failed = {}
+        try:
+            with self.env.cr.savepoint():
+                changed = self._apply(values)
+        except Exception as e:
+            _logger.warning(
+                f"Updating the attribute lines of {len(values)} templates failed, retrying template by template: {str(e)}")
+            changed = set()
+            for template_id, template_values in values.items():
+                try:
+                    with self.env.cr.savepoint():
+                        changed |= self._apply({template_id: template_values})
+                except Exception as template_error:
+                    failed[template_id] = (sorted(rows[template_id]),
+                                           str(template_error))
+        if changed and ptav_index is not None:
+            ptav_index.refresh(changed)
+        return failed
+
+    def _apply(self, values):
+        Line = self.env['product.template.attribute.line']
+        lines = {
+            (line.product_tmpl_id.id, line.attribute_id.id): line
+            for line in Line.search([('product_tmpl_id', 'in', list(values))])}
+        changed = set()
+        new_lines = []
+        for template_id, template_values in values.items():
+            for attr_id, value_ids in template_values.items():
+                line = lines.get((template_id, attr_id))
+                if not line:
+                    new_lines.append({
+                        'product_tmpl_id': template_id,
+                        'attribute_id': attr_id,
+                        'value_ids': [(6, 0, sorted(value_ids))],
+                    })
+                    changed.add(template_id)
+                    continue
+                new_value_ids = value_ids - set(line.value_ids.ids)
+                if new_value_ids:
+                    line.value_ids = [(4, value_id)
+                                      for value_id in sorted(new_value_ids)]
+                    changed.add(template_id)
+        if new_lines:
+            Line.create(new_lines)
+        _logger.debug(
+            f"Attribute lines: added values to {len(changed)} of {len(values)} templates")
+        return changed
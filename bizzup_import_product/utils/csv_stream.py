@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+"""Lazy CSV reading helpers shared by the product and lot importers.
+
+Every step is a generator so only the current batch of rows is ever held in
+memory, whatever the size of the sheet.
+"""
+
+import csv
+import io
+from itertools import chain, islice
+
+from .xlsx_stream import is_xlsx, iter_xlsx_rows
+
+# Data rows at the top of the sheet that are never imported
+SKIP_ROWS = 5
+
+
+def iter_csv_rows(file_path):
+    """Yield the rows of a CSV file one at a time as dicts keyed by the header row.
+
+    The file is decoded as UTF-8 (a BOM is dropped), header names are
+    stripped and values of extra unnamed columns are discarded.
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as csv_file:
+        yield from iter_csv_text(csv_file)
+
+
+def iter_sheet_rows(file_path):
+    """Yield the rows of a CSV file or, going by its extension, of an XLSX workbook."""
+    if is_xlsx(file_path):
+        return iter_xlsx_rows(file_path)
+    return iter_csv_rows(file_path)
+
+
+def iter_csv_bytes(data):
+    """Yield the rows of CSV file content, e.g. of an attachment, like :func:`iter_csv_rows`."""
+    with io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig',
+                          newline='') as csv_file:
+        yield from iter_csv_text(csv_file)
+
+
+def iter_csv_text(csv_file):
+    """Yield the rows of an open text file as dicts keyed by the stripped header row."""
+    reader = csv.DictReader(csv_file)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip() for name in reader.fieldnames]
+    for row in reader:
+        row.pop(None, None)
+        yield row
+
+
+def peek_row(rows):
+    """Return the first row of an iterable and an iterator over all its rows.
+
+    :return: tuple (first row or None, iterator still yielding the first row)
+    """
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        return None, iter(())
+    return first_row, chain([first_row], rows)
+
+
+def skip_rows(rows, count=SKIP_ROWS):
+    """Lazily drop the first ``count`` rows of an iterable."""
+    return islice(rows, count, None)
+
+
+def iter_batches(rows, batch_size):
+    """Group an iterable of rows into lists of at most ``batch_size`` rows."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def number_rows(rows, start_row=1):
+    """Pair the rows of a batch with their row numbers.
+
+    :param start_row: row number of the first row, or the row numbers of the
+                      rows when they are not consecutive (e.g. the rows of a
+                      chunk job)
+    :return: list of (row number, row)
+    """
+    if isinstance(start_row, int):
+        return list(enumerate(rows, start=start_row))
+    return list(zip(start_row, rows))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+
+class ImportLedger:
+    """Timings, query count and row errors of an import, between two flushes.
+
+    The importers fill it while they process a batch and
+    ``product.import.run`` stores and resets it once the batch is done, so
+    nothing is logged per row.
+    """
+    PHASES = ('lookup', 'create', 'commit')
+
+    def __init__(self, cr):
+        self.cr = cr
+        self.reset()
+
+    def reset(self):
+        self.timings = dict.fromkeys(self.PHASES, 0.0)
+        self.errors = []
+        self._query_start = self.cr.sql_log_count
+
+    @property
+    def query_count(self):
+        """Queries run since the last reset."""
+        return self.cr.sql_log_count - self._query_start
+
+    @contextmanager
+    def timed(self, phase):
+        """Add the time spent in the block to a phase."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] += time.perf_counter() - start_time
+
+    def add_error(self, stage, row_number, key, message):
+        self.errors.append({
+            'stage': stage,
+            'row_number': row_number,
+            'key': key or False,
+            'message': message,
+        })
+
+
+@contextmanager
+def timed(ledger, phase):
+    """:meth:`ImportLedger.timed` that does nothing without a ledger."""
+    if ledger is None:
+        yield
+    else:
+        with ledger.timed(phase):
+            yield
+
+
+def report_row_error(ledger, stage, row_number, key, message):
+    """Record a row error in the ledger, or log it when there is none."""
+    if ledger is None:
+        _logger.error(f"Row {row_number}: {message}")
+    else:
+        ledger.add_error(stage, row_number, key, message)
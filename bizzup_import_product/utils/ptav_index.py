@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+
+class PtavIndex:
+    """In-memory (template, attribute, value) -> product.template.attribute.value index.
+
+    Templates are indexed with one query the first time a batch touches them
+    and re-read when the import adds attribute lines or values to them, so
+    resolving the attribute values of a product needs no query per row.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self._index = {}
+        self._template_ids = set()
+        # Template ids of every read, in order, see mark and rollback
+        self._journal = []
+
+    def load(self, template_ids):
+        """Index the template attribute values of templates not indexed yet."""
+        missing = set(template_ids) - self._template_ids
+        if missing:
+            self._read(missing)
+
+    def refresh(self, template_ids):
+        """Re-read the template attribute values of templates whose lines changed."""
+        template_ids = set(template_ids)
+        self._index = {key: ptav_id for key, ptav_id in self._index.items()
+                       if key[0] not in template_ids}
+        self._read(template_ids)
+
+    def _read(self, template_ids):
+        self._template_ids |= template_ids
+        self._journal.append(frozenset(template_ids))
+        # Default order, the first match wins like the search(limit=1) it replaces
+        ptavs = self.env['product.template.attribute.value'].search_read(
+            [('product_tmpl_id', 'in', list(template_ids))],
+            ['product_tmpl_id', 'attribute_id', 'product_attribute_value_id'])
+        for ptav in ptavs:
+            self._index.setdefault(
+                (ptav['product_tmpl_id'][0], ptav['attribute_id'][0],
+                 ptav['product_attribute_value_id'][0]), ptav['id'])
+
+    def get(self, template_id, attribute_id, value_id):
+        """Return the id of the template attribute value, or None if the template has none."""
+        if template_id not in self._template_ids:
+            self.load([template_id])
+        return self._index.get((template_id, attribute_id, value_id))
+
+    def mark(self):
+        """Return the point to :meth:`rollback` to, taken before a savepoint."""
+        return len(self._journal)
+
+    def rollback(self, mark):
+        """Forget the templates read since ``mark``, their values may have been rolled back.
+
+        They are read again the next time a row needs them.
+        """
+        forgotten = frozenset().union(*self._journal[mark:])
+        del self._journal[mark:]
+        if forgotten:
+            self._index = {key: ptav_id for key, ptav_id in self._index.items()
+                           if key[0] not in forgotten}
+            self._template_ids -= forgotten
+
+    def clear(self):
+        """Forget everything, e.g. after a rollback removed indexed records."""
+        self._index.clear()
+        self._template_ids.clear()
+        self._journal.clear()
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+"""Decoder of the product sheet rows, built once from the header row.
+
+Cell cleaning and parsing rules live here so the template, product and lot
+importers read the sheet the same way. A :class:`SheetSchema` remembers the
+date format of each date column and memoizes repeated dates, prices and
+titles, turning a raw CSV row into a typed record in one call. Rows of a
+workbook may hold numbers and dates instead of text, which skip parsing.
+"""
+
+import hashlib
+import logging
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
+
+_logger = logging.getLogger(__name__)
+
+# Columns the lot, template and product imports require
+LOT_HEADERS = frozenset({'S/N'})
+TEMPLATE_HEADERS = frozenset({'Product Title', 'S/N', 'Supplier name',
+                              'Status', 'Sale price', 'Product Category', 'EU',
+                              'Top', 'Base Color', 'HL', 'Length (inch)',
+                              'Layer', 'Style', 'Size'})
+PRODUCT_HEADERS = TEMPLATE_HEADERS | {'Date Ordered', 'תאריך הגעה',
+                                      'Sold date'}
+
+# Product attribute name -> sheet column
+ATTRIBUTE_COLUMNS = {
+    'Top': 'Top',
+    'Base Color': 'Base Color',
+    'HL': 'HL',
+    'Length': 'Length (inch)',
+    'Layer': 'Layer',
+    'Style': 'Style',
+    'Size': 'Size',
+}
+# Record field -> sheet column of the dates
+DATE_COLUMNS = {
+    'date_ordered': 'Date Ordered',
+    'arrival_date': 'תאריך הגעה',
+    'sold_date': 'Sold date',
+}
+DATE_FORMATS = ('%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S')
+# Day-first and month-first formats told apart by the dates of a column
+DAY_FIRST, MONTH_FIRST = '%d/%m/%Y', '%m/%d/%Y'
+# Month-first dates a column needs, and no day-first one, before its
+# ambiguous dates are read month first
+DATE_EVIDENCE = 3
+EXCEL_EPOCH = datetime(1899, 12, 30)
+# Map EU to source field
+SOURCE_MAP = {'eu': 'eu', 'br': 'br', '#n/a': 'na'}
+EMPTY_VALUES = frozenset({'', '#N/A', '#ref!', 'None'})
+SERIAL_SUFFIX = re.compile(r'\s*\(#\d+\)')
+PRICE_JUNK = re.compile(r'[^\d,.]')
+# Distinct values memoized per column
+MEMO_SIZE = 4096
+
+
+def clean_value(value):
+    """Clean input value by trimming and handling empty or invalid values.
+
+    Numbers of a workbook become the text a CSV export would hold (a whole
+    float loses its decimal part), dates are returned as they are.
+    """
+    if value is None or (isinstance(value, str) and value in EMPTY_VALUES):
+        return False
+    if isinstance(value, str):
+        cleaned = value.strip().replace('"', '')
+        return cleaned if cleaned else False
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def parse_sale_price(price_str):
+    """Parse sale price by removing currency symbols and converting to float."""
+    if not price_str:
+        return 0.0
+    if isinstance(price_str, (int, float)):
+        # Numeric cell of a workbook
+        return float(price_str)
+    try:
+        return float(PRICE_JUNK.sub('', price_str).replace(',', ''))
+    except (ValueError, TypeError):
+        _logger.warning(f"Invalid sale price format: {price_str}")
+        return 0.0
+
+
+def parse_product_name(product_title):
+    """Extract product name by removing S/N (e.g., 'Regular Fall (#10001)' → 'Regular Fall')."""
+    if not product_title:
+        return False
+    return SERIAL_SUFFIX.sub('', product_title).strip() or False
+
+
+def name_match_key(name):
+    """Normalize a product name for matching: case and spacing are ignored."""
+    return ' '.join(name.split()).lower() if name else False
+
+
+def match_date(date_str, date_formats=DATE_FORMATS):
+    """Parse a date string or Excel serial date.
+
+    :return: tuple (date or False, format that matched or None)
+    """
+    if not date_str:
+        return False, None
+    # Date cells of a workbook need no parsing
+    if isinstance(date_str, datetime):
+        return date_str.date(), None
+    if isinstance(date_str, date):
+        return date_str, None
+    try:
+        # Handle Excel serial date numbers (e.g., 44180)
+        if isinstance(date_str, (int, float)) or str(date_str).isdigit():
+            return (EXCEL_EPOCH + timedelta(days=float(date_str))).date(), None
+        for date_format in date_formats:
+            try:
+                return datetime.strptime(date_str, date_format).date(), date_format
+            except ValueError:
+                continue
+    except (ValueError, TypeError):
+        pass
+    _logger.warning(f"Invalid date format: {date_str}")
+    return False, None
+
+
+def unambiguous_date_format(date_str):
+    """Return the one of day-first and month-first that reads a date, or None if both or neither do."""
+    if not isinstance(date_str, str):
+        return None
+    matches = []
+    for date_format in (DAY_FIRST, MONTH_FIRST):
+        try:
+            datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+        matches.append(date_format)
+    return matches[0] if len(matches) == 1 else None
+
+
+def parse_date(date_str):
+    """Parse date string or Excel serial date to Odoo date format, supporting multiple formats."""
+    return match_date(date_str)[0]
+
+
+def row_fingerprint(row, headers=None):
+    """Hash the normalized content of a CSV row."""
+    normalized = '\x1f'.join(
+        f"{header}\x1e{clean_value(row.get(header)) or ''}"
+        for header in (headers or sorted(row)))
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def row_key(row, headers=None):
+    """Return the S/N of a CSV row, or a code derived from its content when it has none.
+
+    The fallback code is deterministic so the same row maps to the same
+    product (and fingerprint) on every run.
+    """
+    return clean_value(row.get('S/N')) or \
+        f"PROD-{row_fingerprint(row, headers)[:12]}"
+
+
+class SheetSchema:
+    """Typed view of the sheet, built once per import from its header row.
+
+    Dates are read day first unless the formats of the file, detected from
+    all its rows with :meth:`observe_dates`, say otherwise; they never
+    change while the rows are decoded, so a cell reads the same in every
+    chunk of a file.
+    """
+
+    def __init__(self, headers, date_formats=None):
+        """
+        :param date_formats: optional dict {column: formats in the order
+                             they are tried}, see :meth:`detected_date_formats`
+        """
+        self.headers = tuple(headers)
+        self._sorted_headers = sorted(self.headers)
+        self._date_formats = {column: tuple(formats) for column, formats
+                              in (date_formats or {}).items()}
+        # Column -> format -> dates only that format reads
+        self._date_evidence = {column: {DAY_FIRST: 0, MONTH_FIRST: 0}
+                               for column in DATE_COLUMNS.values()}
+        self._date_order = lru_cache(MEMO_SIZE)(unambiguous_date_format)
+        self._price = lru_cache(MEMO_SIZE)(parse_sale_price)
+        self._title = lru_cache(MEMO_SIZE)(parse_product_name)
+        self._dates = {
+            column: lru_cache(MEMO_SIZE)(partial(self._parse_column_date, column))
+            for column in DATE_COLUMNS.values()}
+
+    def missing_headers(self, required):
+        """Return the required columns the sheet does not have."""
+        return set(required) - set(self.headers)
+
+    def _parse_column_date(self, column, date_str):
+        return match_date(date_str,
+                          self._date_formats.get(column, DATE_FORMATS))[0]
+
+    def observe_dates(self, row):
+        """Count the dates of a row that only read day first or month first."""
+        for column, evidence in self._date_evidence.items():
+            date_format = self._date_order(clean_value(row.get(column)))
+            if date_format:
+                evidence[date_format] += 1
+
+    def detected_date_formats(self):
+        """Return the date formats of the observed rows, per column.
+
+        A column is read month first only when at least ``DATE_EVIDENCE``
+        of its dates can only be month first and none can only be day
+        first; other columns keep the default day-first order.
+
+        :return: JSON-serializable dict {column: list of formats}
+        """
+        return {
+            column: [MONTH_FIRST] + [date_format for date_format in DATE_FORMATS
+                                     if date_format != MONTH_FIRST]
+            for column, evidence in self._date_evidence.items()
+            if evidence[MONTH_FIRST] >= DATE_EVIDENCE and not evidence[DAY_FIRST]}
+
+    def fingerprint(self, row):
+        return row_fingerprint(row, self._sorted_headers)
+
+    def key(self, row):
+        return row_key(row, self._sorted_headers)
+
+    def serial_number(self, row):
+        return clean_value(row.get('S/N')) or False
+
+    def decode(self, row):
+        """Turn a raw CSV row into the typed record used by the importers."""
+        status = clean_value(row.get('Status'))
+        status = status.lower() if status else False
+        eu_field = clean_value(row.get('EU'))
+        eu_field = eu_field.lower() if eu_field else 'na'
+        attributes = {}
+        for attribute, column in ATTRIBUTE_COLUMNS.items():
+            value = clean_value(row.get(column))
+            # Remove False/empty values
+            if value:
+                attributes[attribute] = value
+        record = {
+            'product_title': self._title(
+                clean_value(row.get('Product Title'))) or 'Empty Product',
+            'default_code': self.key(row),
+            'supplier_name': clean_value(row.get('Supplier name')),
+            # Only keep status if it is not '#REF!'
+            'status': status if status and status != '#ref!' else False,
+            # Default to 0.0 if invalid
+            'sale_price': self._price(row.get('Sale price')) or 0.0,
+            'category_name': clean_value(row.get('Product Category')),
+            'source': SOURCE_MAP.get(eu_field, 'na'),
+            'attributes': attributes,
+        }
+        for field_name, column in DATE_COLUMNS.items():
+            record[field_name] = self._dates[column](
+                clean_value(row.get(column)))
+        return record
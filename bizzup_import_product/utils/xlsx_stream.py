@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+"""Streaming reader of the product sheet workbook.
+
+The workbook is opened in read-only mode, openpyxl then parses the worksheet
+as rows are requested, so memory stays bounded whatever the size of the
+sheet. Cells keep the type Excel stored: dates come as ``date``/``datetime``
+and numbers as ``int``/``float``, which :class:`SheetSchema` takes as they
+are instead of parsing text.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    _logger.debug("openpyxl is not installed, XLSX product sheets cannot be read")
+    openpyxl = None
+
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def is_xlsx(file_name, mimetype=None):
+    """Tell whether a file is a workbook from its name or mimetype."""
+    return mimetype == XLSX_MIMETYPE or bool(
+        file_name and file_name.lower().endswith(XLSX_EXTENSIONS))
+
+
+def iter_xlsx_rows(source, sheet_name=None):
+    """Yield the rows of a workbook sheet one at a time as dicts keyed by the header row.
+
+    Rows have the shape of :func:`iter_csv_rows`: header names are
+    stripped, empty cells are ``''`` and unnamed columns are dropped. Blank
+    rows are kept, like the empty lines of a CSV export, so row numbers and
+    the rows skipped at the top of the sheet match the CSV reader; only the
+    blank rows at the end of the sheet are dropped. Dates at midnight are
+    returned as ``date``.
+
+    :param source: path or binary file object of the workbook
+    :param sheet_name: sheet to read, the first one by default
+    """
+    if openpyxl is None:
+        raise ImportError("openpyxl is required to read XLSX product sheets")
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        headers = [str(name).strip() if name is not None else None
+                   for name in header]
+        # Blank rows seen since the last row with data
+        blank_rows = 0
+        for values in rows:
+            if all(value is None or value == '' for value in values):
+                blank_rows += 1
+                continue
+            for _blank in range(blank_rows):
+                yield dict.fromkeys((name for name in headers if name), '')
+            blank_rows = 0
+            row = dict.fromkeys((name for name in headers if name), '')
+            for name, value in zip(headers, values):
+                if not name or value is None:
+                    continue
+                if isinstance(value, datetime) and value.time() == time(0):
+                    value = value.date()
+                row[name] = value
+            yield row
+    finally:
+        workbook.close()
+
+
+def jsonable_row(row):
+    """Return a row with its date and time cells as text, e.g. to store it in a Json field.
+
+    The text is what the row fingerprint uses, so a stored row keeps the
+    fingerprint of the row read from the workbook.
+    """
+    return {name: str(value) if isinstance(value, (date, time, timedelta))
+            else value for name, value in row.items()}
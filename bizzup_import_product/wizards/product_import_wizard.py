@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import base64
+import csv
+import io
+from itertools import islice
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+
+from ..utils.csv_stream import iter_csv_bytes
+from ..utils.sheet_schema import PRODUCT_HEADERS, SheetSchema
+from ..utils.xlsx_stream import XLSX_MIMETYPE, is_xlsx, iter_xlsx_rows
+
+
+class ProductImportWizard(models.TransientModel):
+    """Upload a product sheet (CSV or XLSX) and queue its import or validation on the cron workers."""
+    _name = 'product.import.wizard'
+    _description = 'Import Product Sheet'
+
+    file = fields.Binary(string='File', required=True,
+                         help="Product sheet as a CSV or XLSX file.")
+    filename = fields.Char(string='File Name')
+    full = fields.Boolean(
+        string='Full Import',
+        help="Reprocess every row, ignoring the rows already imported unchanged.")
+
+    def _read_rows(self, data, xlsx, limit=1):
+        """Return the first ``limit`` rows of the uploaded file.
+
+        Unreadable files raise a :class:`UserError`.
+        """
+        try:
+            if xlsx:
+                rows = iter_xlsx_rows(io.BytesIO(data))
+            else:
+                rows = iter_csv_bytes(data)
+            return list(islice(rows, limit))
+        except ImportError:
+            raise UserError(_("Reading XLSX files requires the openpyxl Python library, upload a CSV export instead."))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise UserError(_("The file could not be read as a UTF-8 CSV: %s", e))
+        except Exception as e:
+            if not xlsx:
+                raise
+            raise UserError(_("The file could not be read as an XLSX workbook: %s", e))
+
+    def action_validate(self):
+        """Queue a check of the whole file, run on the cron workers without writing anything.
+
+        The report of what the import would do is shown on the queued run.
+
+        :return: action opening the queued run
+        """
+        return self._queue_run(validate_only=True)
+
+    def action_import(self):
+        """Store the file as an attachment of a queued run and wake up the planner cron.
+
+        Only the header row is read here, planning and importing the rows
+        run on the cron workers.
+
+        :return: action opening the queued run
+        """
+        return self._queue_run()
+
+    def _queue_run(self, validate_only=False):
+        self.ensure_one()
+        data = base64.b64decode(self.file)
+        xlsx = is_xlsx(self.filename)
+        first_row = next(iter(self._read_rows(data, xlsx, limit=1)), None)
+        missing = SheetSchema(first_row or ()).missing_headers(PRODUCT_HEADERS)
+        if not first_row or missing:
+            raise UserError(_("The file is missing the columns: %s",
+                              ', '.join(sorted(missing or PRODUCT_HEADERS))))
+
+        run = self.env['product.import.run'].create({
+            'name': self.filename or 'product_sheet_upload',
+            'state': 'queued',
+            'full': self.full,
+            'validate_only': validate_only,
+        })
+        run.attachment_id = self.env['ir.attachment'].create({
+            'name': self.filename or 'product_sheet.csv',
+            'raw': data,
+            'mimetype': XLSX_MIMETYPE if xlsx else 'text/csv',
+            'res_model': 'product.import.run',
+            'res_id': run.id,
+        })
+        cron = self.env.ref('bizzup_import_product.cron_plan_queued_runs',
+                            raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return {
+            'name': _('Product Import Run'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'product.import.run',
+            'res_id': run.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
@@ -17,7 +17,7 @@
             - Display of aggregated financial totals in the contact form.
             - Smart button integration for quick access to financial summary.
         """,
-    "version": "18.0.1.0.2",
+    "version": "18.0.1.0.9",
     "license": "Other proprietary",
     "author": "Gilliam Management Services and Information Systems, Ltd.",
     "website": "https://bizzup.app",
@@ -26,6 +26,7 @@
         "security/ir.model.access.csv",
         "data/ir_cron_invoice_history.xml",
         "views/financial_history_views.xml",
+        "views/financial_history_rollup_views.xml",
         "views/res_partner_views.xml",
     ],
     "installable": True,
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential. For more information, please contact lg@bizzup.app
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Drop duplicated financial history records before unique(invoice_id) is added.
+
+    The oldest record of every invoice is kept.
+    """
+    if not version:
+        return
+    cr.execute("""
+        DELETE FROM financial_history history
+         USING financial_history kept
+         WHERE kept.invoice_id = history.invoice_id
+           AND kept.id < history.id
+    """)
+    if cr.rowcount:
+        _logger.info(
+            f"Removed {cr.rowcount} duplicated financial history records")
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential. For more information, please contact lg@bizzup.app
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Add and fill the stored invoice columns of financial history in SQL.
+
+    Otherwise the ORM would recompute the new stored related fields record
+    by record when the module is upgraded.
+    """
+    if not version:
+        return
+    cr.execute("""
+        ALTER TABLE financial_history
+            ADD COLUMN IF NOT EXISTS partner_id int4,
+            ADD COLUMN IF NOT EXISTS currency_id int4,
+            ADD COLUMN IF NOT EXISTS date date,
+            ADD COLUMN IF NOT EXISTS amount_untaxed numeric,
+            ADD COLUMN IF NOT EXISTS amount_tax numeric,
+            ADD COLUMN IF NOT EXISTS amount_total numeric
+    """)
+    cr.execute("""
+        UPDATE financial_history history
+           SET partner_id = move.partner_id,
+               currency_id = move.currency_id,
+               date = move.invoice_date,
+               amount_untaxed = move.amount_untaxed,
+               amount_tax = move.amount_tax,
+               amount_total = move.amount_total
+          FROM account_move move
+         WHERE move.id = history.invoice_id
+    """)
+    _logger.info(
+        f"Stored the invoice values of {cr.rowcount} financial history records")
@@ -6,5 +6,7 @@
 # lg@bizzup.app
 
 from . import financial_history
+from . import financial_history_rollup
 from . import res_partner
 from . import account_move
+from . import account_move_line
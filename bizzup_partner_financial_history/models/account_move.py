@@ -6,6 +6,10 @@
 
 from odoo import models, api
 
+# Invoice fields that move an invoice between rollup rows or change its amounts
+ROLLUP_FIELDS = {"partner_id", "invoice_date", "date", "currency_id",
+                 "invoice_line_ids", "line_ids", "move_type"}
+
 
 class AccountMove(models.Model):
     _inherit = "account.move"
@@ -23,3 +27,19 @@ class AccountMove(models.Model):
                 [{"invoice_id": move.id} for move in out_invoices]
             )
         return moves
+
+    def write(self, vals):
+        """
+        Refresh the financial history rollups of the customer invoices whose
+        contact, dates, currency or lines change, once the transaction commits.
+        """
+        if ROLLUP_FIELDS.intersection(vals):
+            self.env["financial.history.rollup"].mark_invoices(
+                self.filtered(lambda m: m.move_type == "out_invoice").ids)
+        return super().write(vals)
+
+    def unlink(self):
+        """Refresh the financial history rollups of deleted customer invoices."""
+        self.env["financial.history.rollup"].mark_invoices(
+            self.filtered(lambda m: m.move_type == "out_invoice").ids)
+        return super().unlink()
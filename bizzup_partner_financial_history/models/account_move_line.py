@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential. For more information, please contact lg@bizzup.app
+
+from odoo import models, api
+
+# Journal item fields that change the amounts of their invoice
+ROLLUP_LINE_FIELDS = {"move_id", "quantity", "price_unit", "discount",
+                      "tax_ids", "balance", "amount_currency", "debit",
+                      "credit", "display_type"}
+
+
+class AccountMoveLine(models.Model):
+    _inherit = "account.move.line"
+
+    def _mark_rollup_invoices(self):
+        """Refresh the financial history rollups of the lines' customer invoices at commit.
+
+        Lines do not change the key of an invoice, only its amounts, so the
+        keys are read at commit.
+        """
+        self.env["financial.history.rollup"].mark_invoices(
+            self.move_id.filtered(lambda m: m.move_type == "out_invoice").ids,
+            keep_keys=False)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._mark_rollup_invoices()
+        return lines
+
+    def write(self, vals):
+        """Refresh the rollups of the invoices whose amounts the lines change, or that they leave or join."""
+        if not ROLLUP_LINE_FIELDS.intersection(vals):
+            return super().write(vals)
+        self._mark_rollup_invoices()
+        result = super().write(vals)
+        if "move_id" in vals:
+            self._mark_rollup_invoices()
+        return result
+
+    def unlink(self):
+        self._mark_rollup_invoices()
+        return super().unlink()
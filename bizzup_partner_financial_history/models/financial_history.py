@@ -4,8 +4,19 @@
 # Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
 # Proprietary and confidential. For more information, please contact lg@bizzup.app
 
-from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Financial history records created per ORM call by sync_invoices
+SYNC_BATCH_SIZE = 1000
+# System parameter keeping the last invoice id and write date seen by the sync
+WATERMARK_PARAM = 'bizzup_partner_financial_history.sync_watermark'
+# Invoices changed this long before the watermark are checked again, to
+# catch transactions that committed after a run
+WATERMARK_OVERLAP = '1 hour'
 
 
 class FinancialHistory(models.Model):
@@ -18,56 +29,138 @@ class FinancialHistory(models.Model):
         "account.move", string="Invoice", required=True,
         domain=[("move_type", "=", "out_invoice")]
     )
+    # Invoice values are stored so the history is filtered, sorted and
+    # grouped in SQL; the ORM keeps them in sync when the invoice changes
     partner_id = fields.Many2one(related="invoice_id.partner_id",
-                                 string="Contact")
+                                 string="Contact", store=True)
 
-    currency_id = fields.Many2one(related="invoice_id.currency_id")
-    date = fields.Date(related="invoice_id.invoice_date", string="Date")
+    currency_id = fields.Many2one(related="invoice_id.currency_id",
+                                  store=True)
+    date = fields.Date(related="invoice_id.invoice_date", string="Date",
+                       store=True, index=True)
     amount_untaxed = fields.Monetary(
         related="invoice_id.amount_untaxed",
         string="Total before Tax",
         currency_field="currency_id",
+        store=True,
     )
     amount_tax = fields.Monetary(
         related="invoice_id.amount_tax", string="Tax",
-        currency_field="currency_id"
+        currency_field="currency_id", store=True
     )
     amount_total = fields.Monetary(
         related="invoice_id.amount_total", string="Amount",
-        currency_field="currency_id"
+        currency_field="currency_id", store=True
     )
 
-    @api.constrains('invoice_id')
-    def _check_duplicate_invoice(self):
-        """
-        Ensure that no duplicate Financial History record is created for the same invoice.
-        """
-        for record in self:
-            # Check if another financial history record already exists for the same invoice_id
-            existing_history = self.search([
-                ('invoice_id', '=', record.invoice_id.id),
-                ('id', '!=', record.id)
-            ])
-            if existing_history:
-                raise ValidationError(
-                    _("A financial history record for this invoice already "
-                      "exists.")
-                )
+    _sql_constraints = [
+        ('invoice_uniq', 'unique(invoice_id)',
+         'A financial history record for this invoice already exists.'),
+    ]
+
+    def init(self):
+        # Lets the incremental sync find the invoices changed since its watermark
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_move_out_invoice_write_date_idx
+                ON account_move (write_date)
+             WHERE move_type = 'out_invoice'
+        """)
+        # Serves the history of a contact in date order (partner tab)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS financial_history_partner_date_idx
+                ON financial_history (partner_id, date DESC)
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Refresh the monthly rollups of the new records' invoices at commit."""
+        records = super().create(vals_list)
+        self.env["financial.history.rollup"].mark_invoices(
+            records.invoice_id.ids)
+        return records
+
+    def write(self, vals):
+        """Refresh the monthly rollups of the old and new invoices at commit."""
+        rollup = self.env["financial.history.rollup"]
+        if "invoice_id" in vals:
+            rollup.mark_invoices(self.invoice_id.ids)
+        result = super().write(vals)
+        if "invoice_id" in vals:
+            rollup.mark_invoices(self.invoice_id.ids)
+        return result
+
+    def unlink(self):
+        """Refresh the monthly rollups of the removed records' invoices at commit."""
+        invoice_ids = self.invoice_id.ids
+        self.env["financial.history.rollup"].mark_invoices(invoice_ids)
+        return super().unlink()
+
+    def _get_sync_watermark(self):
+        """Return the (invoice id, write date) the last sync stopped at, or None."""
+        value = self.env["ir.config_parameter"].sudo().get_param(WATERMARK_PARAM)
+        if not value:
+            return None
+        last_id, last_write_date = value.split(",", 1)
+        return int(last_id), last_write_date
+
+    def _set_sync_watermark(self, last_id, last_write_date):
+        self.env["ir.config_parameter"].sudo().set_param(
+            WATERMARK_PARAM, f"{last_id},{last_write_date}")
 
     @api.model
-    def sync_invoices(self):
+    def sync_invoices(self, full=False):
         """
         Synchronize customer invoices into financial history records.
 
-        This method finds all customer invoices (move_type = 'out_invoice') that are
-        not yet linked to a financial history record, and creates corresponding
-        entries in the financial.history model.
+        This method finds the customer invoices (move_type = 'out_invoice') that are
+        not yet linked to a financial history record with a single anti-join,
+        and creates the corresponding entries in the financial.history model
+        in batches. Duplicates are prevented by the unique index on invoice_id.
+
+        Only the invoices created or changed since the watermark of the
+        previous run are checked, unless ``full`` is set.
 
+        :param full: check every customer invoice and rebuild the monthly
+                     rollups, e.g. for a manual resync
         """
-        existing_invoice_ids = self.search([]).mapped("invoice_id").ids
-        invoices = self.env["account.move"].search(
-            [("move_type", "=", "out_invoice"),
-             ("id", "not in", existing_invoice_ids)]
-        )
-        for invoice in invoices:
-            self.create({"invoice_id": invoice.id})
+        watermark = None if full else self._get_sync_watermark()
+        where = ""
+        params = {"overlap": WATERMARK_OVERLAP, "last_id": None,
+                  "last_write_date": None}
+        if watermark:
+            where = """AND (move.id > %(last_id)s
+                         OR move.write_date > %(last_write_date)s::timestamp
+                                              - %(overlap)s::interval)"""
+            params.update(last_id=watermark[0], last_write_date=watermark[1])
+        self.env.cr.execute(f"""
+            SELECT GREATEST(max(move.id), %(last_id)s),
+                   GREATEST(max(move.write_date),
+                            %(last_write_date)s::timestamp)::varchar
+              FROM account_move move
+             WHERE move.move_type = 'out_invoice'
+                   {where}
+        """, params)
+        last_id, last_write_date = self.env.cr.fetchone()
+        self.env.cr.execute(f"""
+            SELECT move.id
+              FROM account_move move
+             WHERE move.move_type = 'out_invoice'
+                   {where}
+               AND NOT EXISTS (SELECT 1
+                                 FROM financial_history history
+                                WHERE history.invoice_id = move.id)
+             ORDER BY move.id
+        """, params)
+        invoice_ids = [row[0] for row in self.env.cr.fetchall()]
+        for start in range(0, len(invoice_ids), SYNC_BATCH_SIZE):
+            self.create([{"invoice_id": invoice_id} for invoice_id in
+                         invoice_ids[start:start + SYNC_BATCH_SIZE]])
+        if invoice_ids:
+            _logger.info(
+                f"Financial history: created {len(invoice_ids)} records for missing invoices")
+        if full:
+            self.env["financial.history.rollup"].refresh_all()
+        # The write date is kept as Postgres text, with its microseconds, and
+        # only ever compared in SQL
+        if last_id and last_write_date:
+            self._set_sync_watermark(last_id, last_write_date)
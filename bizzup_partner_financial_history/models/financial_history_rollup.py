@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential. For more information, please contact lg@bizzup.app
+
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Key of the invoices and (partner, month, currency) keys to refresh in the
+# precommit data of the cursor
+ROLLUP_PRECOMMIT_KEY = 'financial.history.rollup'
+
+# Monthly key of an invoice, joined as "move"
+MONTH_SQL = "date_trunc('month', COALESCE(move.invoice_date, move.date))::date"
+
+
+class FinancialHistoryRollup(models.Model):
+    """Invoice totals of the financial history per partner, month and currency.
+
+    Rows are refreshed at the end of the transactions that add history
+    records or change their invoices, only for the (partner, month,
+    currency) keys involved, so reports read a handful of rows per partner
+    whatever the size of the invoice history.
+    """
+    _name = "financial.history.rollup"
+    _description = "Financial History Monthly Rollup"
+    _order = "month desc, partner_id"
+    _rec_name = "partner_id"
+
+    partner_id = fields.Many2one("res.partner", string="Contact",
+                                 required=True, ondelete="cascade",
+                                 index=True)
+    month = fields.Date(string="Month", required=True)
+    currency_id = fields.Many2one("res.currency", string="Currency",
+                                  required=True)
+    invoice_count = fields.Integer(string="Invoices")
+    amount_untaxed = fields.Monetary(string="Total before Tax",
+                                     currency_field="currency_id")
+    amount_tax = fields.Monetary(string="Tax", currency_field="currency_id")
+    amount_total = fields.Monetary(string="Amount",
+                                   currency_field="currency_id")
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(partner_id, month, currency_id)',
+         'A rollup row already exists for this contact, month and currency.'),
+    ]
+
+    def init(self):
+        # First install: build every row from the existing history
+        self.env.cr.execute("SELECT 1 FROM financial_history_rollup LIMIT 1")
+        if not self.env.cr.fetchone():
+            self.refresh_all()
+
+    @api.model
+    def refresh_all(self):
+        """Rebuild every row from the financial history."""
+        self.env.cr.execute("DELETE FROM financial_history_rollup")
+        self._upsert("TRUE", {})
+        self.invalidate_model()
+
+    def _upsert(self, key_filter, params):
+        self.env.cr.execute(f"""
+            INSERT INTO financial_history_rollup AS rollup
+                   (partner_id, month, currency_id, invoice_count,
+                    amount_untaxed, amount_tax, amount_total, create_uid,
+                    create_date, write_uid, write_date)
+            SELECT move.partner_id, {MONTH_SQL}, move.currency_id, count(*),
+                   SUM(move.amount_untaxed), SUM(move.amount_tax),
+                   SUM(move.amount_total), %(uid)s, now() at time zone 'UTC',
+                   %(uid)s, now() at time zone 'UTC'
+              FROM financial_history history
+              JOIN account_move move ON move.id = history.invoice_id
+             WHERE move.partner_id IS NOT NULL
+               AND move.currency_id IS NOT NULL
+               AND {key_filter}
+             GROUP BY move.partner_id, {MONTH_SQL}, move.currency_id
+                ON CONFLICT (partner_id, month, currency_id) DO UPDATE
+               SET invoice_count = EXCLUDED.invoice_count,
+                   amount_untaxed = EXCLUDED.amount_untaxed,
+                   amount_tax = EXCLUDED.amount_tax,
+                   amount_total = EXCLUDED.amount_total,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, dict(params, uid=self.env.uid))
+
+    @api.model
+    def mark_invoices(self, invoice_ids, keep_keys=True):
+        """Refresh the rows of invoices before the transaction commits.
+
+        Call it before changing the invoices: their current keys are kept,
+        so the rows they leave are refreshed as well as the rows they join.
+
+        :param keep_keys: read the current keys; pass False when the change
+                          cannot move the invoices to other rows, e.g. from
+                          their lines, to spare the query and the flush
+        """
+        if not invoice_ids:
+            return
+        data = self.env.cr.precommit.data.get(ROLLUP_PRECOMMIT_KEY)
+        if data is None:
+            data = {'invoice_ids': set(), 'keys': set()}
+            self.env.cr.precommit.data[ROLLUP_PRECOMMIT_KEY] = data
+            self.env.cr.precommit.add(self._refresh_marked)
+        data['invoice_ids'].update(invoice_ids)
+        if keep_keys:
+            data['keys'].update(self._get_keys(invoice_ids))
+
+    def _get_keys(self, invoice_ids):
+        """Return the (partner, month, currency) keys of invoices with financial history."""
+        self.env["account.move"].flush_model(
+            ["partner_id", "invoice_date", "date", "currency_id"])
+        self.env["financial.history"].flush_model(["invoice_id"])
+        self.env.cr.execute(f"""
+            SELECT move.partner_id, {MONTH_SQL}, move.currency_id
+              FROM account_move move
+              JOIN financial_history history ON history.invoice_id = move.id
+             WHERE move.id = ANY(%s)
+               AND move.partner_id IS NOT NULL
+               AND move.currency_id IS NOT NULL
+        """, [list(invoice_ids)])
+        return set(self.env.cr.fetchall())
+
+    def _refresh_marked(self):
+        data = self.env.cr.precommit.data.pop(ROLLUP_PRECOMMIT_KEY, None)
+        if not data:
+            return
+        keys = data['keys'] | self._get_keys(data['invoice_ids'])
+        if keys:
+            self.refresh_keys(keys)
+
+    @api.model
+    def refresh_keys(self, keys):
+        """Recompute the rows of (partner id, month, currency id) keys.
+
+        Keys left without any invoice lose their row.
+        """
+        partner_ids, months, currency_ids = (list(values) for values in zip(*keys))
+        params = {'partner_ids': partner_ids, 'months': months,
+                  'currency_ids': currency_ids}
+        self.env.cr.execute("""
+            DELETE FROM financial_history_rollup rollup
+             USING unnest(%(partner_ids)s::int[], %(months)s::date[],
+                          %(currency_ids)s::int[]) AS refreshed(partner_id, month, currency_id)
+             WHERE rollup.partner_id = refreshed.partner_id
+               AND rollup.month = refreshed.month
+               AND rollup.currency_id = refreshed.currency_id
+        """, params)
+        self._upsert(f"""
+            (move.partner_id, {MONTH_SQL}, move.currency_id) IN (
+                SELECT * FROM unnest(%(partner_ids)s::int[], %(months)s::date[],
+                                     %(currency_ids)s::int[]))""", params)
+        self.invalidate_model()
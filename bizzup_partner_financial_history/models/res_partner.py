@@ -18,17 +18,32 @@ class ResPartner(models.Model):
 
     total_financial_amount = fields.Monetary(
         string="Total Financial Amount",
-        compute="_compute_total_financial_amount"
+        compute="_compute_total_financial_amount",
+        store=True,
     )
 
     def do_nothing(self):
         """Placeholder method that performs no action (used for smart button binding)."""
         return
 
-    @api.depends("financial_history_ids")
+    @api.depends("financial_history_ids.amount_total")
     def _compute_total_financial_amount(self):
-        """Compute the total financial amount from related financial history records."""
+        """Compute the total financial amount from related financial history records.
+
+        Stored and recomputed only for the partners whose history rows or
+        invoice amounts changed, with one aggregate query for all of them.
+        """
+        totals = {}
+        partner_ids = [partner.id for partner in self if partner.id]
+        if partner_ids:
+            self.env["financial.history"].flush_model(
+                ["partner_id", "amount_total"])
+            self.env.cr.execute("""
+                SELECT partner_id, SUM(amount_total)
+                  FROM financial_history
+                 WHERE partner_id = ANY(%s)
+                 GROUP BY partner_id
+            """, [partner_ids])
+            totals = dict(self.env.cr.fetchall())
         for partner in self:
-            history = partner.financial_history_ids
-            total = sum(history.mapped("amount_total"))
-            partner.total_financial_amount = total
+            partner.total_financial_amount = totals.get(partner.id, 0.0)
@@ -8,14 +8,14 @@
 
 {
     'name': 'Bizzup Purchase Serial Number',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.0.1',
     'description': """
         Adds lot/serial number field to purchase order lines '
        'and auto-assigns to stock move lines.
     """,
     'author': 'Softhealer Technologies',
     'website': 'www.bizzup.app',
-    'depends': ['purchase_stock'],
+    'depends': ['purchase_stock', 'bizzup_serial_registry'],
     'data': [
         'data/serial_sequence.xml',
         'views/purchase_order_view.xml',
@@ -19,14 +19,33 @@ class StockMoveLine(models.Model):
         """
         Assigns serial numbers to the specified stock move line records using a predefined sequence.
         Only move lines that do not already have a `lot_name` will be updated.
+        Serial numbers already known to the serial registry are skipped, and the
+        assigned ones are registered for the product of their line.
 
         :param record_ids: List of stock.move.line record IDs to process.
         :return: True if operation completes successfully.
         """
-        lines = self.browse(record_ids).sorted(key=lambda l: l.id)
-        for line in lines:
-            if not line.lot_name:
-                serial = self.env['ir.sequence'].next_by_code(
-                    'stock.move.line.lot.number')
-                line.lot_name = serial
+        lines = self.browse(record_ids).filtered(
+            lambda l: not l.lot_name).sorted(key=lambda l: l.id)
+        if not lines:
+            return True
+        Sequence = self.env['ir.sequence']
+        Registry = self.env['stock.serial.registry']
+        serials = []
+        while len(serials) < len(lines):
+            candidates = []
+            for _i in range(len(lines) - len(serials)):
+                serial = Sequence.next_by_code('stock.move.line.lot.number')
+                if not serial:
+                    return False
+                candidates.append(serial)
+            # One registry lookup per round of generated serials
+            taken = Registry.resolve(candidates)
+            serials += [serial for serial in candidates if serial not in taken]
+        for line, serial in zip(lines, serials):
+            line.lot_name = serial
+        Registry.register({
+            serial: (line.product_id.id, None)
+            for line, serial in zip(lines, serials)
+        })
         return True
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+{
+    "name": "Bizzup Serial Registry",
+    "description": """
+        Ticket : HT01634
+        Registry of single-unit serial numbers mapping each S/N to its product
+        and lot, unique per serial. Shared by the product import and the
+        purchase serial number assignment.
+     """,
+    "version": "18.0.1.0.1",
+    "category": "",
+    "license": "Other proprietary",
+    "author": "Gilliam Management Services and Information Systems, Ltd.",
+    "website": "www.bizzup.app",
+    "depends": ["stock"],
+    "data": ["security/ir.model.access.csv"],
+    "installable": True,
+    "application": False,
+}
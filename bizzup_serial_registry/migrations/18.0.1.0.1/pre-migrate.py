@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Give the registered serials the product of their lot."""
+    if not version:
+        return
+    cr.execute("""
+        UPDATE stock_serial_registry registry
+           SET product_id = lot.product_id
+          FROM stock_lot lot
+         WHERE lot.id = registry.lot_id
+           AND registry.product_id IS DISTINCT FROM lot.product_id
+    """)
+    if cr.rowcount:
+        _logger.info(
+            f"Serial registry: {cr.rowcount} serials now point to the product of their lot")
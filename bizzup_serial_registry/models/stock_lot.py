@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+from odoo import models, api
+
+
+class StockLot(models.Model):
+    _inherit = 'stock.lot'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lots = super().create(vals_list)
+        lots._register_serials()
+        return lots
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'name' in vals or 'product_id' in vals:
+            self.env['stock.serial.registry'].release_lots(self.ids)
+            self._register_serials()
+        return res
+
+    def _register_serials(self):
+        """Register the lots under their name in the serial registry."""
+        self.env['stock.serial.registry'].register({
+            lot.name: (lot.product_id.id, lot.id) for lot in self})
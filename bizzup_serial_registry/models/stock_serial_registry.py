@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) Gilliam Management Services and Information Systems, Ltd. (the owner of Bizzup), 2021, 2022, 2023, 2024, 2025
+# All Rights Reserved to Gilliam Management Services and Information Systems, Ltd.
+# Unauthorized copying, editing or printing of this file, in any way is strictly prohibited
+# Proprietary and confidential for more information, please contact
+# lg@bizzup.app
+
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class StockSerialRegistry(models.Model):
+    """Serial number -> product -> lot, one row per serial.
+
+    The product is the one of the lot, or of the receipt line the serial
+    was assigned to before its lot exists. Products carrying a S/N as
+    internal reference are not registered, they are found on their
+    indexed ``default_code``.
+
+    The unique index on the serial makes duplicates impossible and keeps
+    lookups constant-time however large the single-unit catalog grows.
+    Reads and writes go through :meth:`resolve` and :meth:`register`,
+    which handle whole batches of serials with one query each.
+    """
+    _name = 'stock.serial.registry'
+    _description = 'Serial Number Registry'
+    _rec_name = 'name'
+
+    name = fields.Char(string='Serial Number', required=True)
+    product_id = fields.Many2one('product.product', string='Product',
+                                 ondelete='cascade')
+    lot_id = fields.Many2one('stock.lot', string='Lot/Serial',
+                             ondelete='set null')
+
+    _sql_constraints = [
+        ('name_uniq', 'unique(name)', 'A serial number can only be registered once.'),
+    ]
+
+    def init(self):
+        # Register the lots that exist before the registry, oldest lot first
+        self.env.cr.execute("""
+            INSERT INTO stock_serial_registry AS registry
+                   (name, product_id, lot_id, create_uid, create_date,
+                    write_uid, write_date)
+            SELECT DISTINCT ON (lot.name) lot.name, lot.product_id, lot.id,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s,
+                   now() at time zone 'UTC'
+              FROM stock_lot lot
+             ORDER BY lot.name, lot.id
+                ON CONFLICT (name) DO UPDATE
+               SET lot_id = EXCLUDED.lot_id,
+                   product_id = EXCLUDED.product_id
+             WHERE registry.lot_id IS NULL
+        """, {'uid': self.env.uid})
+
+    @api.model
+    def resolve(self, serials):
+        """Return the registered product and lot of serial numbers with one query.
+
+        :return: dict {serial: (product id or None, lot id or None)}, only
+                 for the registered serials
+        """
+        if not serials:
+            return {}
+        self.env.cr.execute("""
+            SELECT name, product_id, lot_id
+              FROM stock_serial_registry
+             WHERE name = ANY(%s)
+        """, [list(serials)])
+        return {name: (product_id, lot_id)
+                for name, product_id, lot_id in self.env.cr.fetchall()}
+
+    @api.model
+    def register(self, entries):
+        """Register serial numbers with one upsert.
+
+        The first product registered for a serial wins; a missing product or
+        lot is filled in by later registrations. The first lot of a serial
+        brings its product along, replacing the product of a receipt line.
+
+        :param entries: dict {serial: (product id or None, lot id or None)}
+        :return: dict {serial: (product id, lot id)} of the serials already
+                 registered for another product
+        """
+        entries = {serial: ids for serial, ids in entries.items() if serial}
+        if not entries:
+            return {}
+        self.env.cr.execute("""
+            INSERT INTO stock_serial_registry AS registry
+                   (name, product_id, lot_id, create_uid, create_date,
+                    write_uid, write_date)
+            SELECT entry.name, entry.product_id, entry.lot_id, %(uid)s,
+                   now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM unnest(%(names)s::varchar[], %(product_ids)s::integer[],
+                          %(lot_ids)s::integer[])
+                   AS entry(name, product_id, lot_id)
+                ON CONFLICT (name) DO UPDATE
+               SET product_id = CASE
+                       WHEN registry.lot_id IS NULL AND EXCLUDED.lot_id IS NOT NULL
+                       THEN EXCLUDED.product_id
+                       ELSE COALESCE(registry.product_id, EXCLUDED.product_id)
+                   END,
+                   lot_id = COALESCE(registry.lot_id, EXCLUDED.lot_id),
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            RETURNING name, product_id, lot_id
+        """, {
+            'uid': self.env.uid,
+            'names': list(entries),
+            'product_ids': [product_id for product_id, _lot_id in entries.values()],
+            'lot_ids': [lot_id for _product_id, lot_id in entries.values()],
+        })
+        conflicts = {
+            name: (product_id, lot_id)
+            for name, product_id, lot_id in self.env.cr.fetchall()
+            if entries[name][0] and product_id != entries[name][0]}
+        self.invalidate_model()
+        if conflicts:
+            _logger.warning(
+                f"Serial numbers already registered for another product: {', '.join(sorted(conflicts))}")
+        return conflicts
+
+    @api.model
+    def release_lots(self, lot_ids):
+        """Detach lots from the serials they are registered under."""
+        if not lot_ids:
+            return
+        self.env.cr.execute("""
+            UPDATE stock_serial_registry
+               SET lot_id = NULL
+             WHERE lot_id = ANY(%s)
+        """, [list(lot_ids)])
+        self.invalidate_model()